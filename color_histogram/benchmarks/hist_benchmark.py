@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.benchmarks.hist_benchmark
+#
+#  Reproducible benchmark suite of the color histogram stages.
+#
+#  Stages are measured separately:
+#  - 'color_pixels': pixel sampling and float32 RGB conversion (ColorPixels).
+#  - 'convert':      color conversion of the RGB pixels (convertRGBPixels).
+#  - 'hist1D', 'hist2D', 'hist3D': histogram builds from ColorPixels with the converted pixels.
+#  - 'plot1D', 'plot2D', 'plot3D': plotting of the built histograms on an Agg figure.
+#  The stages are swept over the images, num_bins and color spaces,
+#  and each case reports its latencies (p50/p95), throughput (Mpixel/s) and peak memory.
+#  Synthetic images are generated from fixed seeds, so the inputs are the same across runs.
+#  @author      tody
+#  @date        2026/10/18
+
+import os
+import sys
+import json
+import platform
+import traceback
+
+import numpy as np
+
+from color_histogram.io_util.image import loadRGB
+from color_histogram.core.color_pixels import ColorPixels, convertRGBPixels
+from color_histogram.core.color_space import colorSpaceNames
+from color_histogram.core.hist_1d import Hist1D
+from color_histogram.core.hist_2d import Hist2D
+from color_histogram.core.hist_3d import Hist3D
+from color_histogram.datasets.datasets import dataDir, dataFile
+from color_histogram.plot.canvas import aggFigure
+from color_histogram.util.benchmark import measure
+
+## Benchmark stages in the measurement order.
+stage_names = ["color_pixels", "convert", "hist1D", "hist2D", "hist3D", "plot1D", "plot2D", "plot3D"]
+
+## Stages independent of num_bins and color space (measured once per image).
+_pixel_stages = ["color_pixels"]
+
+## Stages independent of num_bins (measured once per image and color space).
+_color_stages = ["convert"]
+
+_hist_classes = {"1D": Hist1D, "2D": Hist2D, "3D": Hist3D}
+
+
+## Synthetic RGB image for the benchmarks.
+#  @param shape     (h, w) of the image.
+#  @param content   'noise' for uniform random colors (all bins occupied),
+#                   'gradient' for smooth color ramps, 'blocks' for a few flat color regions (few bins occupied).
+#  @param seed      random seed of 'noise' and 'blocks'.
+#  @return          (h x w x 3) uint8 RGB image.
+def syntheticImage(shape=(512, 512), content="noise", seed=0):
+    h, w = shape
+    random_state = np.random.RandomState(seed)
+
+    if content == "noise":
+        return random_state.randint(0, 256, size=(h, w, 3)).astype(np.uint8)
+
+    if content == "gradient":
+        y, x = np.mgrid[0:h, 0:w]
+        r = x / float(max(w - 1, 1))
+        g = y / float(max(h - 1, 1))
+        b = 0.5 * (r + 1.0 - g)
+        return np.uint8(255.0 * np.dstack((r, g, b)) + 0.5)
+
+    if content == "blocks":
+        block_size = max(min(h, w) // 8, 1)
+        num_blocks = ((h + block_size - 1) // block_size, (w + block_size - 1) // block_size)
+        block_colors = random_state.randint(0, 256, size=num_blocks + (3,)).astype(np.uint8)
+        image = np.repeat(np.repeat(block_colors, block_size, axis=0), block_size, axis=1)
+        return np.ascontiguousarray(image[:h, :w])
+
+    raise ValueError("Unknown synthetic image content: %s" % content)
+
+
+## Synthetic benchmark images.
+#  @param sizes     list of square image sizes.
+#  @param contents  list of synthetic image contents. See syntheticImage.
+#  @return          list of (image name, image).
+def syntheticImages(sizes=[256, 512, 1024], contents=["noise", "gradient", "blocks"], seed=0):
+    images = []
+    for size in sizes:
+        for content in contents:
+            image_name = "%s_%sx%s" % (content, size, size)
+            images.append((image_name, syntheticImage((size, size), content, seed)))
+    return images
+
+
+## Dataset benchmark images from color_histogram.datasets. Missing datasets and images are skipped.
+#  @param data_names  list of dataset names.
+#  @param data_ids    list of image ids in each dataset.
+#  @return            list of (image name, image).
+def datasetImages(data_names=["flower", "apple"], data_ids=range(3)):
+    images = []
+    for data_name in data_names:
+        if not os.path.isdir(dataDir(data_name)):
+            continue
+
+        for data_id in data_ids:
+            image_file = dataFile(data_name, data_id)
+            if image_file is None:
+                continue
+
+            image_name = os.path.splitext(os.path.basename(image_file))[0]
+            images.append(("%s/%s" % (data_name, image_name), loadRGB(image_file)))
+    return images
+
+
+## Benchmark function of the stage.
+#
+#  Inputs of the stage (e.g. the converted pixels for the histogram builds) are prepared here,
+#  so the returned function runs the target stage only.
+#  @param stage         stage name. See stage_names.
+#  @param image         RGB image.
+#  @param num_bins      number of histogram bins.
+#  @param color_space   color space name. See color_histogram.core.color_space.
+#  @param num_pixels    target number of pixels from the image. None for all pixels.
+#  @param sampling      pixel sampling method.
+#  @return              function without arguments.
+def stageFunc(stage, image, num_bins=16, color_space="rgb", num_pixels=None, sampling="stride"):
+    if stage == "color_pixels":
+        return lambda: ColorPixels(image, num_pixels, sampling).rgb()
+
+    color_pixels = ColorPixels(image, num_pixels, sampling)
+
+    if stage == "convert":
+        rgb_pixels = color_pixels.rgb()
+        return lambda: convertRGBPixels(rgb_pixels, color_space)
+
+    color_pixels.pixels(color_space)
+    hist_kind = stage[-2:]
+
+    if stage.startswith("hist"):
+        return lambda: _buildHist(hist_kind, color_pixels, num_bins, color_space)
+
+    if stage.startswith("plot"):
+        return _plotFunc(hist_kind, _buildHist(hist_kind, color_pixels, num_bins, color_space))
+
+    raise ValueError("Unknown benchmark stage: %s" % stage)
+
+
+def _buildHist(hist_kind, color_pixels, num_bins, color_space):
+    return _hist_classes[hist_kind](color_pixels, num_bins=num_bins, color_space=color_space)
+
+
+def _plotFunc(hist_kind, hist):
+    fig = aggFigure((6, 6))
+    if hist_kind == "3D":
+        from mpl_toolkits.mplot3d import Axes3D
+        ax = fig.add_subplot(111, projection='3d')
+    else:
+        ax = fig.add_subplot(111)
+
+    def _plot():
+        ax.cla()
+        hist.plot(ax)
+        fig.canvas.draw()
+    return _plot
+
+
+## Benchmark cases of the sweep.
+#  @return  list of (stage, num_bins, color_space). None for the parameters the stage does not depend on.
+def benchmarkCases(stages=stage_names, num_bins_list=[8, 16, 32, 64, 128], color_spaces=None):
+    if color_spaces is None:
+        color_spaces = colorSpaceNames()
+
+    cases = []
+    for stage in stages:
+        if stage in _pixel_stages:
+            cases.append((stage, None, None))
+            continue
+
+        for color_space in color_spaces:
+            if stage in _color_stages:
+                cases.append((stage, None, color_space))
+                continue
+
+            for num_bins in num_bins_list:
+                cases.append((stage, num_bins, color_space))
+    return cases
+
+
+## Run the benchmark sweep.
+#  @param images         list of (image name, image). See syntheticImages and datasetImages.
+#  @param stages         list of stage names.
+#  @param num_bins_list  list of num_bins.
+#  @param color_spaces   list of color space names. None for all registered color spaces.
+#  @param num_pixels     target number of pixels from each image. None for all pixels.
+#  @param sampling       pixel sampling method.
+#  @param num_repeats    number of the measured calls of each case.
+#  @param num_warmups    number of the calls before the measurement.
+#  @param isolate        measure each case in a forked process for its own peak memory.
+#  @param verbose        print the progress.
+#  @return               list of the case records. Failed cases have the traceback in 'error'.
+def runBenchmarks(images, stages=stage_names, num_bins_list=[8, 16, 32, 64, 128], color_spaces=None,
+                  num_pixels=None, sampling="stride", num_repeats=5, num_warmups=1, isolate=True, verbose=True):
+    cases = benchmarkCases(stages, num_bins_list, color_spaces)
+
+    records = []
+    for image_name, image in images:
+        h, w = image.shape[:2]
+        image_pixels = ColorPixels(image, num_pixels, sampling).numPixels()
+
+        for stage, num_bins, color_space in cases:
+            record = {"stage": stage, "image": image_name, "width": w, "height": h,
+                      "num_bins": num_bins, "color_space": color_space,
+                      "num_pixels": image_pixels, "sampling": sampling}
+
+            try:
+                func = stageFunc(stage, image, num_bins, color_space or "rgb", num_pixels, sampling)
+                record.update(measure(func, num_repeats, num_warmups, isolate))
+                record["mpixels_per_s"] = record["num_pixels"] / (1000.0 * record["p50_ms"])
+            except Exception:
+                record["error"] = traceback.format_exc()
+
+            records.append(record)
+
+            if verbose:
+                _printRecord(record)
+    return records
+
+
+## Environment information of the benchmark results.
+def environmentInfo():
+    import cv2
+    import matplotlib
+
+    return {"python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "matplotlib": matplotlib.__version__}
+
+
+## Save the benchmark records as JSON for the regression tracking.
+#  @param file_path   output JSON file path.
+#  @param records     list of the case records from runBenchmarks.
+#  @param config      benchmark settings to record with the results.
+def saveBenchmarkResults(file_path, records, config={}):
+    results = {"environment": environmentInfo(),
+               "config": config,
+               "results": records}
+
+    with open(file_path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+## Load the benchmark results saved by saveBenchmarkResults.
+def loadBenchmarkResults(file_path):
+    with open(file_path, "r") as f:
+        return json.load(f)
+
+
+def _printRecord(record):
+    case_name = "%s %s" % (record["stage"], record["image"])
+    if record["color_space"] is not None:
+        case_name += " %s" % record["color_space"]
+    if record["num_bins"] is not None:
+        case_name += " %s bins" % record["num_bins"]
+
+    if "error" in record:
+        print "  - Failed: %s" % case_name
+        print record["error"]
+        return
+
+    print "  - %s: p50 %.2f ms, p95 %.2f ms, %.1f Mpixel/s, peak %.1f MB" % (
+        case_name, record["p50_ms"], record["p95_ms"], record["mpixels_per_s"], record["peak_rss_mb"])
+
+
+if __name__ == '__main__':
+    result_file = "hist_benchmark.json"
+    if len(sys.argv) > 1:
+        result_file = sys.argv[1]
+
+    config = {"sizes": [256, 512, 1024],
+              "contents": ["noise", "gradient", "blocks"],
+              "data_names": ["flower", "apple"],
+              "data_ids": range(3),
+              "stages": stage_names,
+              "num_bins_list": [8, 16, 32, 64, 128],
+              "color_spaces": colorSpaceNames(),
+              "num_pixels": None,
+              "num_repeats": 5,
+              "num_warmups": 1,
+              "seed": 0}
+
+    images = syntheticImages(config["sizes"], config["contents"], config["seed"])
+    images += datasetImages(config["data_names"], config["data_ids"])
+
+    records = runBenchmarks(images, config["stages"], config["num_bins_list"], config["color_spaces"],
+                            config["num_pixels"], num_repeats=config["num_repeats"],
+                            num_warmups=config["num_warmups"])
+    saveBenchmarkResults(result_file, records, config)
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.core.bin_lut
+#
+#  Histogram bin lookup tables for uint8 RGB pixels.
+#
+#  With a fixed color range, bin IDs of uint8 RGB pixels only depend on the pixel values.
+#  RGB bins are looked up from 256-entry tables for each channel, and are exact.
+#  Bins of the other color spaces can optionally be looked up from a quantized RGB table (64^3 entries),
+#  so no float32 or color space conversion is needed for the pixels.
+#  The quantized bins are approximated at the quantized RGB cell centers,
+#  so the pixels near the bin boundaries may move to the neighbor bins compared with the exact binning.
+#  The quantized table is opt-in (quantized_lut of the histograms) and requires a fixed color range:
+#  histograms with the quantized table are only comparable with each other.
+#  @author      tody
+#  @date        2026/10/18
+
+import numpy as np
+
+from color_histogram.core.color_pixels import convertRGBPixels
+from color_histogram.core.hist_common import colorBinIDs
+from color_histogram.cv.image import to32F
+
+## Number of bits per channel for the quantized RGB table.
+_quantize_bits = 6
+
+## Maximum number of cached lookup tables.
+_max_cached_luts = 16
+
+_lut_cache = {}
+
+
+## Integer bin IDs and RGB colors of the sampled pixels.
+#
+#  uint8 RGB images with a fixed color range are binned via the exact RGB lookup tables
+#  (or the approximate quantized table if quantized_lut is True),
+#  and uint8 RGB colors are returned without float32 conversion.
+#  @param color_pixels   ColorPixels of the image. None for no pixels.
+#  @param color_space    target color space. 'rgb', 'Lab', 'hsv', 'Luv', 'OKLab', 'OKLCh' (see core.color_space).
+#  @param channels       target color channels.
+#  @param num_bins       number of histogram bins for each channel.
+#  @param color_range    [c_min, c_max] of the target channels.
+#  @param use_lut        use lookup tables if the pixels are uint8 RGB.
+#  @param quantized_lut  use the approximate quantized RGB table for the color spaces other than 'rgb'.
+#  @return               (n x len(channels)) bin IDs, (n x 3) RGB colors (float32 or uint8).
+def pixelBinIDs(color_pixels, color_space, channels, num_bins, color_range, use_lut=False, quantized_lut=False):
+    if color_pixels is None:
+        return np.zeros((0, len(channels)), dtype=np.int32), np.zeros((0, 3), dtype=np.float32)
+
+    if use_lut and num_bins <= 256 and (color_space == "rgb" or quantized_lut):
+        rgb8_pixels = color_pixels.rgb8()
+        if rgb8_pixels is not None:
+            return lutBinIDs(rgb8_pixels, color_space, channels, num_bins, color_range), rgb8_pixels
+
+    pixels = color_pixels.pixels(color_space)
+    if list(channels) != range(pixels.shape[1]):
+        pixels = pixels[:, channels]
+    return colorBinIDs(pixels, num_bins, color_range), color_pixels.rgb()
+
+
+## Bin IDs of (n x 3) uint8 RGB pixels via lookup tables.
+def lutBinIDs(rgb8_pixels, color_space, channels, num_bins, color_range):
+    c_min = np.float32(color_range[0]).reshape(-1)
+    c_max = np.float32(color_range[1]).reshape(-1)
+
+    if color_space == "rgb":
+        lut = rgbBinLUT(channels, num_bins, [c_min, c_max])
+        color_ids = np.empty((rgb8_pixels.shape[0], len(channels)), dtype=np.uint8)
+        for ci, channel in enumerate(channels):
+            color_ids[:, ci] = lut[rgb8_pixels[:, channel], ci]
+        return color_ids
+
+    lut = quantizedBinLUT(color_space, channels, num_bins, [c_min, c_max])
+    return lut[quantizedRGBIDs(rgb8_pixels)]
+
+
+## (256 x len(channels)) bin IDs for uint8 RGB channel values.
+def rgbBinLUT(channels, num_bins, color_range):
+    key = ("rgb", tuple(channels), num_bins, _rangeKey(color_range))
+    lut = _lut_cache.get(key)
+    if lut is not None:
+        return lut
+
+    values = to32F(np.arange(256, dtype=np.uint8)).reshape(-1, 1)
+    lut = np.uint8(colorBinIDs(values, num_bins, color_range))
+    return _cacheLUT(key, lut)
+
+
+## (64^3 x len(channels)) bin IDs for quantized uint8 RGB colors.
+def quantizedBinLUT(color_space, channels, num_bins, color_range):
+    key = (color_space, tuple(channels), num_bins, _rangeKey(color_range))
+    lut = _lut_cache.get(key)
+    if lut is not None:
+        return lut
+
+    pixels = convertRGBPixels(quantizedRGBColors(), color_space)[:, channels]
+    lut = np.uint8(colorBinIDs(pixels, num_bins, color_range))
+    return _cacheLUT(key, lut)
+
+
+## Flat quantized RGB IDs of (n x 3) uint8 RGB pixels.
+def quantizedRGBIDs(rgb8_pixels):
+    shift = 8 - _quantize_bits
+    q_pixels = np.right_shift(rgb8_pixels, shift)
+
+    q_ids = np.int32(q_pixels[:, 0]) << (2 * _quantize_bits)
+    q_ids |= np.int32(q_pixels[:, 1]) << _quantize_bits
+    q_ids |= q_pixels[:, 2]
+    return q_ids
+
+
+## (64^3 x 3) float32 RGB colors at the centers of the quantized RGB cells.
+def quantizedRGBColors():
+    num_levels = 1 << _quantize_bits
+    step = 256 // num_levels
+    levels = (np.arange(num_levels, dtype=np.float32) * step + 0.5 * (step - 1)) / 255.0
+
+    r, g, b = np.meshgrid(levels, levels, levels, indexing='ij')
+    return np.dstack((r.ravel(), g.ravel(), b.ravel())).reshape(-1, 3)
+
+
+def _rangeKey(color_range):
+    c_min, c_max = color_range
+    return tuple(np.float32(c_min).ravel()), tuple(np.float32(c_max).ravel())
+
+
+def _cacheLUT(key, lut):
+    if len(_lut_cache) >= _max_cached_luts:
+        _lut_cache.clear()
+    _lut_cache[key] = lut
+    return lut
@@ -8,64 +8,219 @@
 
 import numpy as np
 
-from color_histogram.cv.image import to32F, rgb2Lab, rgb2hsv, gray2rgb
+from color_histogram.cv.image import to32F, rgbPixels, alpha
+from color_histogram.core.color_space import colorSpace
+from color_histogram.util import instrument
 
 
 ## Implementation of color pixels.
 #
-#  input image is automatically converted into np.float32 format.
+#  Pixels are sampled from the input image first,
+#  then only the sampled pixels are converted into np.float32 format and the target color spaces.
+#  Converted pixels are cached for each color space,
+#  so a single ColorPixels can be shared by multiple histograms of the same image.
 class ColorPixels:
     ## Constructor
     #  @param image          input image.
-    #  @param num_pixels     target number of pixels from the image.
-    def __init__(self, image, num_pixels=1000):
-        self._image = to32F(image)
+    #  @param num_pixels     target number of pixels from the image. None for all pixels.
+    #  @param sampling       pixel sampling method. 'stride' or 'random' or 'grid'.
+    #  @param seed           random seed for 'random' and 'grid' sampling.
+    #  @param mask           None for all pixels, (h x w) boolean mask of the target pixels,
+    #                        or alpha threshold (0.0-1.0) for the pixels with alpha > threshold in RGBA images.
+    #                        Masked pixels are sampled via pixel indices without copying the image.
+    def __init__(self, image, num_pixels=1000, sampling="stride", seed=None, mask=None):
+        self._image = image
         self._num_pixels = num_pixels
-        self._rgb_pixels = None
-        self._Lab = None
-        self._hsv = None
+        self._sampling = sampling
+        self._seed = seed
+
+        with instrument.span("color_pixels.sample", sampling=sampling):
+            if mask is None:
+                self._pixel_ids = samplePixelIDs(image.shape[:2], num_pixels, sampling, seed)
+            else:
+                self._pixel_ids = sampleMaskedPixelIDs(maskPixelIDs(image, mask), num_pixels, sampling, seed)
+            instrument.count("pixels_sampled", self.numPixels())
+        self._pixels = {}
 
     ## RGB pixels.
     def rgb(self):
-        if self._rgb_pixels is None:
-            self._rgb_pixels = self.pixels("rgb")
-        return self._rgb_pixels
+        return self.pixels("rgb")
 
     ## Lab pixels.
     def Lab(self):
-        if self._Lab is None:
-            self._Lab = self.pixels("Lab")
-        return self._Lab
+        return self.pixels("Lab")
 
     ## HSV pixels.
     def hsv(self):
-        if self._hsv is None:
-            self._hsv = self.pixels("hsv")
-        return self._hsv
+        return self.pixels("hsv")
+
+    ## uint8 RGB pixels without float32 conversion. None if the image is not uint8.
+    def rgb8(self):
+        if self._image.dtype != np.uint8:
+            return None
+
+        pixels = self._pixels.get("rgb8")
+        if pixels is None:
+            pixels = rgbPixels(self._image2pixels(self._image))
+            self._pixels["rgb8"] = pixels
+        return pixels
 
     ## Pixels of the given color space.
     def pixels(self, color_space="rgb"):
-        image = np.array(self._image)
+        pixels = self._pixels.get(color_space)
+        if pixels is None:
+            pixels = self._convertPixels(color_space)
+            self._pixels[color_space] = pixels
+        return pixels
+
+    ## Color spaces already converted.
+    def colorSpaces(self):
+        return self._pixels.keys()
+
+    def _convertPixels(self, color_space):
         if color_space == "rgb":
-            if _isGray(image):
-                image = gray2rgb(image)
+            with instrument.span("color_pixels.rgb") as span:
+                pixels = rgbPixels(to32F(self._image2pixels(self._image)))
+                span.count("bytes_allocated", pixels.nbytes)
+            return pixels
+
+        rgb_pixels = self.rgb()
+        with instrument.span("color_pixels.convert", color_space=color_space) as span:
+            pixels = convertRGBPixels(rgb_pixels, color_space)
+            span.count("conversions")
+            span.count("bytes_allocated", pixels.nbytes)
+        return pixels
 
-        if color_space == "Lab":
-            image = rgb2Lab(self._image)
+    ## Number of the sampled pixels.
+    def numPixels(self):
+        if self._pixel_ids is None:
+            h, w = self._image.shape[:2]
+            return h * w
+        return len(self._pixel_ids)
 
-        if color_space == "hsv":
-            image = rgb2hsv(self._image)
-        return self._image2pixels(image)
+    ## Flat pixel indices of the sampled pixels. None for all pixels.
+    def pixelIDs(self):
+        return self._pixel_ids
 
     def _image2pixels(self, image):
         if _isGray(image):
             h, w = image.shape
-            step = h * w / self._num_pixels
-            return image.reshape((h * w))[::step]
+            pixels = image.reshape((h * w))
+        else:
+            h, w, cs = image.shape
+            pixels = image.reshape((-1, cs))
+
+        if self._pixel_ids is None:
+            return pixels
+        return pixels[self._pixel_ids]
+
+
+## ColorPixels for the image. Given ColorPixels (or None) is returned as it is for sharing,
+#  so num_pixels, sampling, seed and mask only apply to the images.
+def toColorPixels(image, num_pixels=1000, sampling="stride", seed=None, mask=None):
+    if image is None or isinstance(image, ColorPixels):
+        return image
+    return ColorPixels(image, num_pixels, sampling, seed, mask)
+
+
+## Native color range [c_min, c_max] of the given color space and channels.
+def nativeColorRange(color_space="rgb", channels=[0, 1, 2]):
+    return colorSpace(color_space).colorRange(channels)
+
+
+## Convert (n x 3) float32 RGB pixels into the given color space.
+#  @param out   C-contiguous (n x 3) float32 output buffer. None for a new array.
+def convertRGBPixels(rgb_pixels, color_space="rgb", out=None):
+    return colorSpace(color_space).convert(rgb_pixels, out)
+
+
+## Flat pixel indices for the given sampling method.
+#  @param image_size     (h, w) of the image.
+#  @param num_pixels     target number of pixels. None for all pixels.
+#  @param sampling       'stride': exactly num_pixels pixels with a uniform stride.
+#                        'random': exactly num_pixels random pixels without replacement.
+#                        'grid':   about num_pixels pixels on a spatially stratified grid.
+#  @param seed           random seed for 'random' and 'grid' sampling.
+#                        'grid' samples cell centers if seed is None, jittered positions otherwise.
+#  @return               sorted flat pixel indices, or None if all pixels are used.
+def samplePixelIDs(image_size, num_pixels, sampling="stride", seed=None):
+    h, w = image_size
+    total = h * w
+
+    if num_pixels is None or num_pixels >= total:
+        return None
 
-        h, w, cs = image.shape
-        step = h * w / self._num_pixels
-        return image.reshape((-1, cs))[::step]
+    num_pixels = max(int(num_pixels), 1)
+
+    if sampling == "stride":
+        return (np.arange(num_pixels, dtype=np.int64) * total) // num_pixels
+
+    if sampling == "random":
+        random_state = np.random.RandomState(seed)
+        pixel_ids = random_state.choice(total, num_pixels, replace=False)
+        pixel_ids.sort()
+        return pixel_ids
+
+    if sampling == "grid":
+        grid_h = int(np.clip(np.rint(np.sqrt(num_pixels * h / float(w))), 1, h))
+        grid_w = int(np.clip(np.rint(num_pixels / float(grid_h)), 1, w))
+
+        if seed is None:
+            ys = np.int64((np.arange(grid_h).reshape(-1, 1) + 0.5) * h / grid_h)
+            xs = np.int64((np.arange(grid_w).reshape(1, -1) + 0.5) * w / grid_w)
+            return (ys * w + xs).ravel()
+
+        # Jittered samples stay inside their own whole-pixel cells, so no pixel is sampled twice.
+        random_state = np.random.RandomState(seed)
+        ys = _jitteredCellSamples(h, grid_h, random_state).reshape(-1, 1)
+        xs = _jitteredCellSamples(w, grid_w, random_state).reshape(1, -1)
+        return (ys * w + xs).ravel()
+
+    raise ValueError("Unknown sampling method: %s" % sampling)
+
+
+## Random sample positions in num_cells whole-pixel cells of [0, size).
+def _jitteredCellSamples(size, num_cells, random_state):
+    cell_starts = (np.arange(num_cells + 1, dtype=np.int64) * size) // num_cells
+    cell_sizes = np.diff(cell_starts)
+    offsets = np.int64(random_state.rand(num_cells) * cell_sizes)
+    return cell_starts[:-1] + np.minimum(offsets, cell_sizes - 1)
+
+
+## Flat pixel indices of the target pixels for the mask.
+#  @param image   input image.
+#  @param mask    (h x w) boolean mask, or alpha threshold (0.0-1.0) for RGBA images.
+#                 Scalar booleans are rejected, since True would be an alpha threshold of 1.0.
+def maskPixelIDs(image, mask):
+    if isinstance(mask, (bool, np.bool_)):
+        raise ValueError("Mask must be a (h x w) boolean mask or an alpha threshold, not %s" % mask)
+
+    if isinstance(mask, (float, int, long, np.floating, np.integer)):
+        alpha_channel = alpha(image)
+        if alpha_channel is None:
+            raise ValueError("Alpha threshold requires an RGBA image")
+
+        threshold = mask
+        if alpha_channel.dtype == np.uint8:
+            threshold = 255.0 * mask
+        return np.flatnonzero(alpha_channel > threshold)
+
+    mask = np.asarray(mask)
+    if mask.shape != image.shape[:2]:
+        raise ValueError("Mask size %s does not match the image size %s" % (mask.shape, image.shape[:2]))
+    return np.flatnonzero(mask)
+
+
+## Sampled flat pixel indices from the masked pixel indices.
+#
+#  The sampling methods are applied to the masked pixels in the scan order,
+#  so 'grid' is a stratified sampling along the scan order.
+#  @return               sorted flat pixel indices.
+def sampleMaskedPixelIDs(mask_ids, num_pixels, sampling="stride", seed=None):
+    sample_ids = samplePixelIDs((1, len(mask_ids)), num_pixels, sampling, seed)
+    if sample_ids is None:
+        return mask_ids
+    return mask_ids[sample_ids]
 
 
 def _isGray(image):
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.core.color_space
+#
+#  Registry of the color spaces for color histograms.
+#
+#  Each color space provides a vectorized transform from (n x 3) float32 RGB pixels,
+#  native channel ranges for fixed-range binning, and channel labels for plotting.
+#  Built-in color spaces: 'rgb', 'Lab', 'hsv', 'Luv', 'OKLab' and 'OKLCh'.
+#  @author      tody
+#  @date        2026/10/18
+
+import numpy as np
+import cv2
+
+from color_histogram.cv.image import convertPixels, rgb2LabPixels, rgb2hsvPixels
+
+
+## Color space definition.
+class ColorSpace:
+    ## Constructor
+    #  @param name        color space name used by the histograms.
+    #  @param transform   function(rgb_pixels, out) to convert (n x 3) float32 RGB pixels.
+    #                     out is a (n x 3) float32 output buffer or None.
+    #  @param c_min       native minimum values of the channels.
+    #  @param c_max       native maximum values of the channels.
+    #  @param labels      channel labels for plotting.
+    #  @param hue_channel channel of the hue in degrees, which is circular. None for the color spaces without hue.
+    def __init__(self, name, transform, c_min, c_max, labels, hue_channel=None):
+        self._name = name
+        self._transform = transform
+        self._c_min = np.float32(c_min)
+        self._c_max = np.float32(c_max)
+        self._labels = list(labels)
+        self._hue_channel = hue_channel
+
+    def name(self):
+        return self._name
+
+    ## Convert (n x 3) float32 RGB pixels into the color space.
+    #  @param out   C-contiguous (n x 3) float32 output buffer. None for a new array.
+    def convert(self, rgb_pixels, out=None):
+        return self._transform(rgb_pixels, out)
+
+    ## Native color range [c_min, c_max] of the given channels.
+    def colorRange(self, channels=[0, 1, 2]):
+        return [self._c_min[channels], self._c_max[channels]]
+
+    def labels(self):
+        return list(self._labels)
+
+    ## Label of the channel.
+    def label(self, channel):
+        return self._labels[channel]
+
+    ## Channel of the hue in degrees. None for the color spaces without hue.
+    def hueChannel(self):
+        return self._hue_channel
+
+
+_color_spaces = {}
+
+
+## Register the color space. Existing color space with the same name is replaced.
+def registerColorSpace(color_space):
+    _color_spaces[color_space.name()] = color_space
+
+
+## Color space for the name.
+def colorSpace(name):
+    if name not in _color_spaces:
+        raise ValueError("Unknown color space: %s" % name)
+    return _color_spaces[name]
+
+
+## Names of the registered color spaces.
+def colorSpaceNames():
+    return sorted(_color_spaces.keys())
+
+
+def _rgb2rgb(rgb_pixels, out=None):
+    if out is None:
+        return rgb_pixels
+    out[:] = rgb_pixels
+    return out
+
+
+def _rgb2Luv(rgb_pixels, out=None):
+    return convertPixels(rgb_pixels, cv2.COLOR_RGB2Luv, out)
+
+
+## Linear sRGB to LMS matrix of OKLab.
+_oklab_lms = np.float32([[0.4122214708, 0.5363325363, 0.0514459929],
+                         [0.2119034982, 0.6806995451, 0.1073969566],
+                         [0.0883024619, 0.2817188376, 0.6299787005]])
+
+## Non-linear LMS to OKLab matrix.
+_oklab_lab = np.float32([[0.2104542553, 0.7936177850, -0.0040720468],
+                         [1.9779984951, -2.4285922050, 0.4505937099],
+                         [0.0259040371, 0.7827717662, -0.8086757660]])
+
+
+## sRGB to OKLab (Bjorn Ottosson, 2020) with vectorized numpy operations.
+def _rgb2OKLab(rgb_pixels, out=None):
+    rgb_pixels = np.asarray(rgb_pixels, dtype=np.float32)
+
+    linear = rgb_pixels / np.float32(12.92)
+    curve = rgb_pixels > 0.04045
+    linear[curve] = np.power((rgb_pixels[curve] + np.float32(0.055)) / np.float32(1.055), np.float32(2.4))
+
+    lms = np.cbrt(np.dot(linear, _oklab_lms.T))
+    Lab = np.dot(lms, _oklab_lab.T)
+
+    if out is None:
+        return Lab
+    out[:] = Lab
+    return out
+
+
+## sRGB to OKLCh (polar OKLab: lightness, chroma, hue in degrees).
+def _rgb2OKLCh(rgb_pixels, out=None):
+    Lab = _rgb2OKLab(rgb_pixels)
+
+    LCh = Lab if out is None else out
+    a = Lab[:, 1].copy()
+    b = Lab[:, 2].copy()
+    LCh[:, 0] = Lab[:, 0]
+    LCh[:, 1] = np.hypot(a, b)
+    LCh[:, 2] = np.degrees(np.arctan2(b, a)) % 360.0
+    return LCh
+
+
+registerColorSpace(ColorSpace("rgb", _rgb2rgb, [0.0, 0.0, 0.0], [1.0, 1.0, 1.0], ["r", "g", "b"]))
+registerColorSpace(ColorSpace("Lab", rgb2LabPixels, [0.0, -127.0, -127.0], [100.0, 127.0, 127.0], ["L", "a", "b"]))
+registerColorSpace(ColorSpace("hsv", rgb2hsvPixels, [0.0, 0.0, 0.0], [360.0, 1.0, 1.0], ["h", "s", "v"],
+                              hue_channel=0))
+registerColorSpace(ColorSpace("Luv", _rgb2Luv, [0.0, -134.0, -140.0], [100.0, 220.0, 122.0], ["L", "u", "v"]))
+registerColorSpace(ColorSpace("OKLab", _rgb2OKLab, [0.0, -0.24, -0.32], [1.0, 0.28, 0.2], ["L", "a", "b"]))
+registerColorSpace(ColorSpace("OKLCh", _rgb2OKLCh, [0.0, 0.0, 0.0], [1.0, 0.33, 360.0], ["L", "C", "h"],
+                              hue_channel=2))
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.core.distance
+#
+#  Batched distances between color histograms.
+#
+#  All distance functions compare a query histogram with N histograms in one call.
+#  Histograms are flat count vectors with the Hist1D, Hist2D, Hist3D dense bin layout
+#  (denseBins()[0].ravel(), or rows of HistogramStore.histBins()),
+#  and are normalized to unit sum before the comparison by default.
+#  @author      tody
+#  @date        2026/10/18
+
+import numpy as np
+
+## Number of histograms processed at once for large (e.g. memory-mapped) inputs.
+_chunk_size = 4096
+
+
+## Flat dense count vectors (N x num_bins^d) of the histograms.
+#  @param hists     list of Hist1D, Hist2D or Hist3D with the same bin layout.
+def histVectors(hists):
+    return np.array([np.ravel(hist.denseBins()[0]) for hist in hists], dtype=np.float32)
+
+
+## Normalize histograms (N x D or D) to unit sum.
+def normalizeHistograms(hist_bins):
+    hist_bins = np.array(hist_bins, dtype=np.float32, ndmin=2)
+    _normalizeRows(hist_bins)
+    return hist_bins
+
+
+## Histogram intersection distance: 1 - sum(min(q, h)).
+def intersectionDistances(query, hists, normalize=True):
+    return _chunkDistances(_intersection, query, hists, normalize)
+
+
+## Chi-square distance: 0.5 * sum((q - h)^2 / (q + h)).
+def chiSquareDistances(query, hists, normalize=True):
+    return _chunkDistances(_chiSquare, query, hists, normalize)
+
+
+## Bhattacharyya (Hellinger) distance: sqrt(1 - sum(sqrt(q * h))).
+def bhattacharyyaDistances(query, hists, normalize=True):
+    return _chunkDistances(_bhattacharyya, query, hists, normalize)
+
+
+## L1 distance: sum(|q - h|).
+def l1Distances(query, hists, normalize=True):
+    return _chunkDistances(_l1, query, hists, normalize)
+
+
+## L2 distance: sqrt(sum((q - h)^2)).
+def l2Distances(query, hists, normalize=True):
+    return _chunkDistances(_l2, query, hists, normalize)
+
+
+## Earth Mover's distance on the bin grid with unit ground distance between neighbor bins.
+#
+#  Exact for 1D histograms.
+#  For 2D and 3D histograms, the sum of the 1D distances of the marginal histograms for each channel,
+#  which is a lower bound of the L1 ground distance EMD.
+#  @param hist_shape  dense bin shape of the histograms, e.g. (num_bins, num_bins, num_bins) for Hist3D.
+#                     None for the shape of the query, so a flat query vector is a 1D histogram.
+def emdDistances(query, hists, hist_shape=None, normalize=True):
+    if hist_shape is None:
+        hist_shape = np.shape(query)
+    hist_shape = tuple(hist_shape)
+    num_dims = len(hist_shape)
+
+    if np.size(query) != np.prod(hist_shape):
+        raise ValueError("Histogram size %s does not match the bin shape %s" % (np.size(query), hist_shape))
+
+    def emd(query, hists):
+        query = query.reshape((1,) + hist_shape)
+        hists = hists.reshape((-1,) + hist_shape)
+
+        distances = np.zeros(hists.shape[0], dtype=np.float32)
+        for axis in xrange(num_dims):
+            sum_axes = tuple(ai + 1 for ai in xrange(num_dims) if ai != axis)
+            query_cdf = np.cumsum(np.sum(query, axis=sum_axes), axis=1)
+            hists_cdf = np.cumsum(np.sum(hists, axis=sum_axes), axis=1)
+            distances += np.sum(np.abs(hists_cdf - query_cdf), axis=1)
+        return distances
+
+    return _chunkDistances(emd, query, hists, normalize)
+
+
+_distance_funcs = {
+    "intersection": intersectionDistances,
+    "chi_square": chiSquareDistances,
+    "bhattacharyya": bhattacharyyaDistances,
+    "l1": l1Distances,
+    "l2": l2Distances,
+    "emd": emdDistances,
+}
+
+
+## Distance methods for histDistances.
+def distanceMethods():
+    return sorted(_distance_funcs.keys())
+
+
+## Distances between the query and N histograms.
+#  @param query       query histogram (D or dense bin shape) with the same bin layout as hists.
+#  @param hists       (N x D) histograms.
+#  @param method      'intersection', 'chi_square', 'bhattacharyya', 'l1', 'l2' or 'emd'.
+#  @param hist_shape  dense bin shape of the histograms for 'emd'. See emdDistances.
+#  @return            (N) distances.
+def histDistances(query, hists, method="intersection", normalize=True, hist_shape=None):
+    if method not in _distance_funcs:
+        raise ValueError("Unknown distance method: %s" % method)
+
+    if method == "emd":
+        return emdDistances(query, hists, hist_shape, normalize=normalize)
+    return _distance_funcs[method](query, hists, normalize=normalize)
+
+
+def _intersection(query, hists):
+    return np.maximum(1.0 - np.sum(np.minimum(hists, query), axis=1), 0.0)
+
+
+def _chiSquare(query, hists):
+    diff = hists - query
+    diff *= diff
+    hist_sum = hists + query
+    positive = hist_sum > 0.0
+    diff[positive] /= hist_sum[positive]
+    return 0.5 * np.sum(diff, axis=1)
+
+
+## Coefficients are accumulated in float64 and divided by the float64 sums,
+#  since the float32 rounding of 1 - coeffs is amplified by the square root (e.g. 1e-7 to 3e-4).
+def _bhattacharyya(query, hists):
+    query = np.float64(query[0])
+    hists = np.float64(hists)
+    coeffs = np.dot(np.sqrt(hists), np.sqrt(query))
+
+    hist_sums = np.sum(hists, axis=1) * np.sum(query)
+    positive = hist_sums > 0.0
+    coeffs[positive] /= np.sqrt(hist_sums[positive])
+    return np.sqrt(1.0 - np.clip(coeffs, 0.0, 1.0))
+
+
+def _l1(query, hists):
+    return np.sum(np.abs(hists - query), axis=1)
+
+
+def _l2(query, hists):
+    diff = hists - query
+    return np.sqrt(np.einsum('ij,ij->i', diff, diff))
+
+
+def _chunkDistances(distance_func, query, hists, normalize):
+    query = np.array(query, dtype=np.float32, ndmin=2).reshape(1, -1)
+    if normalize:
+        query = normalizeHistograms(query)
+
+    hists = np.asanyarray(hists).reshape(len(hists), -1)
+    num_hists = hists.shape[0]
+
+    distances = np.empty(num_hists, dtype=np.float32)
+    for start in xrange(0, num_hists, _chunk_size):
+        end = min(start + _chunk_size, num_hists)
+        chunk = np.array(hists[start:end], dtype=np.float32)
+        if normalize:
+            _normalizeRows(chunk)
+        distances[start:end] = distance_func(query, chunk)
+    return distances
+
+
+def _normalizeRows(hist_bins):
+    hist_sums = np.sum(hist_bins, axis=1)
+    hist_sums[hist_sums == 0.0] = 1.0
+    hist_bins /= hist_sums[:, None]
@@ -8,33 +8,49 @@
 
 import numpy as np
 
-from color_histogram.core.color_pixels import ColorPixels
-from color_histogram.core.hist_common import colorCoordinates, colorDensities, rgbColors, clipLowDensity, range2ticks
+from color_histogram.core.color_pixels import toColorPixels, nativeColorRange
+from color_histogram.core.color_space import colorSpace
+from color_histogram.core.bin_lut import pixelBinIDs
+from color_histogram.core.hist_io import HistHeader, writeHistogram, readHistogram
+from color_histogram.core.hist_common import colorCoordinates, colorDensities, rgbColors, clipLowDensity, range2ticks,\
+    computeHistogramSums, meanColors, addHistogramSums
+from color_histogram.util import instrument
 
 
 ## Implementation of 1D color histograms.
 class Hist1D:
     ## Constructor
-    #  @param image          input image.
+    #  @param image          input image or ColorPixels shared with other histograms.
+    #                        None for an empty histogram with a fixed color_range (filled by update()).
+    #                        ColorPixels are used as they are: num_pixels, sampling, seed and mask are ignored.
     #  @param num_bins       target number of histogram bins.
     #  @param alpha          low density clip.
-    #  @param color_space    target color space. 'rgb' or 'Lab' or 'hsv'.
+    #  @param color_space    target color space. 'rgb', 'Lab', 'hsv', 'Luv', 'OKLab', 'OKLCh' (see core.color_space).
     #  @param channel        target color channel. 0 with 'Lab' = L channel.
-    def __init__(self, image, num_bins=16, alpha=0.1, color_space='Lab', channel=0):
-        self._computeTargetPixels(image, color_space, channel)
+    #  @param num_pixels     target number of pixels from the image. None for all pixels.
+    #  @param sampling       pixel sampling method. 'stride' or 'random' or 'grid'.
+    #  @param seed           random seed for 'random' and 'grid' sampling.
+    #  @param color_range    None for the range of the image pixels, or a fixed range: 'native' or [c_min, c_max].
+    #  @param mask           None for all pixels, boolean mask or alpha threshold. See ColorPixels.
+    #  @param quantized_lut  approximate binning of uint8 images via the quantized RGB table. See core.bin_lut.
+    def __init__(self, image, num_bins=16, alpha=0.1, color_space='Lab', channel=0,
+                 num_pixels=1000, sampling='stride', seed=None, color_range=None, mask=None,
+                 quantized_lut=False):
+        self._computeTargetPixels(image, color_space, channel, num_pixels, sampling, seed, mask)
         self._num_bins = num_bins
+        self._quantized_lut = quantized_lut
         self._alpha = alpha
         self._color_space = color_space
         self._channel = channel
 
-        self._computeColorRange()
+        self._computeColorRange(color_range)
         self._computeHistogram()
 
-        self._plotter = Hist1DPlot(self)
+        self._plotter = None
 
     ## Plot histogram.
     def plot(self, ax):
-        self._plotter.plot(ax)
+        self._getPlotter().plot(ax)
 
     def numBins(self):
         return self._num_bins
@@ -46,67 +62,160 @@ class Hist1D:
         return self._channel
 
     def colorIDs(self):
-        color_ids = np.where(self._histPositive())
-        return color_ids
+        return self._cached("color_ids", lambda: np.where(self._histPositive()))
 
     def colorCoordinates(self):
-        color_ids = self.colorIDs()
-        num_bins = self._num_bins
-        color_range = self._color_range
-        return colorCoordinates(color_ids, num_bins, color_range)
+        return self._cached("color_coordinates",
+                            lambda: colorCoordinates(self.colorIDs(), self._num_bins, self._color_range))
 
     def colorDensities(self):
-        return colorDensities(self._hist_bins)
+        return self._cached("color_densities", lambda: colorDensities(self._hist_bins))
 
     def rgbColors(self):
-        return rgbColors(self._hist_bins, self._color_bins)
+        return self._cached("rgb_colors", lambda: rgbColors(self._hist_bins, self._color_bins))
 
     def colorRange(self):
         return self._color_range
 
-    def _computeTargetPixels(self, image, color_space, channel):
-        color_pixels = ColorPixels(image)
-        self._pixels = color_pixels.pixels(color_space)[:, channel]
-        self._rgb_pixels = color_pixels.rgb()
-
-    def _computeColorRange(self):
-        pixels = self._pixels
-        c_min = np.min(pixels)
-        c_max = np.max(pixels)
+    def alpha(self):
+        return self._alpha
+
+    ## Histogram counts (num_bins).
+    def histBins(self):
+        return self._hist_bins
+
+    ## Mean RGB colors of the bins (num_bins x 3).
+    def colorBins(self):
+        return self._color_bins
+
+    ## Always None: 1D histograms only have the dense storage.
+    def binIDs(self):
+        return None
+
+    ## Dense counts and mean RGB colors.
+    def denseBins(self):
+        return self._hist_bins, self._color_bins
+
+    ## Header of the histogram for serialization.
+    def histHeader(self):
+        return HistHeader(1, self._num_bins, self._alpha, self._color_space, [self._channel], self._color_range)
+
+    ## Raw counts and RGB color sums before the low density clip.
+    #  @return  (None, hist_bins, color_sums) with the same layout as the dense storage of Hist2D, Hist3D.
+    def histSums(self):
+        return None, self._raw_bins, self._color_sums
+
+    ## Accumulate the pixels of the image into the histogram.
+    #
+    #  Requires a fixed color_range, so that all the images share the same bins.
+    #  Only the raw counts and color sums are kept, and the low density clip is applied to the total.
+    #  @param image   input image or ColorPixels.
+    #  @param mask    None for all pixels, boolean mask or alpha threshold. See the constructor.
+    def update(self, image, mask=None):
+        if not self._fixed_range:
+            raise ValueError("update requires a fixed color_range")
+
+        color_pixels = toColorPixels(image, self._num_pixels, self._sampling, self._seed, mask)
+        self._addSums(self._computeSums(color_pixels))
+        return self
+
+    ## Merge the other histogram with the same bin layout into the histogram.
+    def merge(self, hist):
+        if not self.histHeader().isCompatible(hist.histHeader()):
+            raise ValueError("Histogram bin layout does not match")
+
+        self._addSums(hist.histSums())
+        return self
+
+    ## Save the histogram in the compact binary format.
+    #
+    #  The raw counts before the low density clip are saved, so the loaded histogram can be updated and merged.
+    def save(self, file_path):
+        bin_ids, hist_bins, color_sums = self.histSums()
+        writeHistogram(file_path, self.histHeader(), hist_bins, meanColors(hist_bins, color_sums), bin_ids)
+
+    ## Load the histogram saved by save().
+    @staticmethod
+    def load(file_path):
+        header, hist_bins, color_bins, bin_ids = readHistogram(file_path, 1)
+        hist1D = Hist1D(None, header.num_bins, header.alpha, header.color_space, header.channels[0],
+                        color_range=header.colorRange())
+        hist1D._setSums((None, hist_bins, color_bins * hist_bins[:, None]))
+        return hist1D
+
+    def _computeTargetPixels(self, image, color_space, channel, num_pixels, sampling, seed, mask):
+        self._color_pixels = toColorPixels(image, num_pixels, sampling, seed, mask)
+        self._num_pixels = num_pixels
+        self._sampling = sampling
+        self._seed = seed
+
+    def _computeColorRange(self, color_range):
+        if color_range is None and self._color_pixels is None:
+            raise ValueError("color_range is required for an empty histogram")
+
+        if color_range is None:
+            pixels = self._color_pixels.pixels(self._color_space)[:, self._channel]
+            c_min = np.min(pixels)
+            c_max = np.max(pixels)
+        elif isinstance(color_range, basestring):
+            c_min, c_max = nativeColorRange(self._color_space, [self._channel])
+            c_min, c_max = c_min[0], c_max[0]
+        else:
+            c_min, c_max = np.float32(color_range[0]), np.float32(color_range[1])
 
         self._color_range = [c_min, c_max]
+        self._fixed_range = color_range is not None
 
     def _computeHistogram(self):
-        pixels = self._pixels
-
-        num_bins = self._num_bins
-        c_min, c_max = self._color_range
-
-        hist_bins = np.zeros((num_bins), dtype=np.float32)
-        color_bins = np.zeros((num_bins, 3), dtype=np.float32)
-
-        color_ids = (num_bins - 1) * (pixels - c_min) / (c_max - c_min)
-
-        color_ids = np.int32(color_ids)
-
-        for pi, color_id in enumerate(color_ids):
-            hist_bins[color_id] += 1
-            color_bins[color_id] += self._rgb_pixels[pi]
-
-        self._hist_bins = hist_bins
-
-        hist_positive = self._hist_bins > 0.0
-
-        for ci in xrange(3):
-            color_bins[hist_positive, ci] /= self._hist_bins[hist_positive]
-
-        self._color_bins = color_bins
-
-        self._clipLowDensity()
+        self._setSums(self._computeSums(self._color_pixels))
+
+    ## Raw counts and RGB color sums of the pixels.
+    def _computeSums(self, color_pixels):
+        with instrument.span("hist1D.sums", color_space=self._color_space, num_bins=self._num_bins) as span:
+            color_ids, rgb_pixels = pixelBinIDs(color_pixels, self._color_space, [self._channel],
+                                                self._num_bins, self._color_range, self._fixed_range,
+                                                self._quantized_lut)
+            span.count("pixels_binned", len(color_ids))
+            hist_bins, color_sums = computeHistogramSums(color_ids.ravel(), rgb_pixels, self._num_bins)
+        return None, hist_bins, color_sums
+
+    def _setSums(self, sums):
+        _, self._raw_bins, self._color_sums = sums
+        self._updateBins()
+
+    def _addSums(self, sums):
+        self._setSums(addHistogramSums(self.histSums(), sums))
+
+    ## Clipped histogram bins and mean colors from the raw counts and color sums.
+    def _updateBins(self):
+        with instrument.span("hist1D.bins", num_bins=self._num_bins) as span:
+            self._cache = {}
+            self._hist_bins = np.array(self._raw_bins)
+            self._color_bins = meanColors(self._raw_bins, self._color_sums)
+
+            self._clipLowDensity()
+
+            if instrument.enabled():
+                span.count("bins_occupied", int(np.count_nonzero(self._hist_bins)))
+                span.count("bytes_allocated", self._hist_bins.nbytes + self._color_bins.nbytes)
 
     def _clipLowDensity(self):
         clipLowDensity(self._hist_bins, self._color_bins, self._alpha)
 
+    ## Plotter constructed on the first plot() call.
+    def _getPlotter(self):
+        if self._plotter is None:
+            self._plotter = Hist1DPlot(self)
+        return self._plotter
+
+    ## Cached value of the bins, invalidated by the bin updates.
+    def _cached(self, key, compute_func):
+        value = self._cache.get(key)
+        if value is None:
+            value = compute_func()
+            self._cache[key] = value
+        return value
+
     def _histPositive(self):
         return self._hist_bins > 0.0
 
@@ -143,7 +252,7 @@ class Hist1DPlot:
         color_space = self._hist1D.colorSpace()
         channel = self._hist1D.channel()
 
-        ax.set_xlabel(color_space[channel])
+        ax.set_xlabel(colorSpace(color_space).label(channel))
         ax.set_ylabel("Density")
 
         color_range = self._hist1D.colorRange()
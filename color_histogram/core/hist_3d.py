@@ -8,101 +8,246 @@
 
 import numpy as np
 
-from color_histogram.core.color_pixels import ColorPixels
+from color_histogram.core.color_pixels import toColorPixels, nativeColorRange
+from color_histogram.core.color_space import colorSpace
+from color_histogram.core.bin_lut import pixelBinIDs
+from color_histogram.core.hist_io import HistHeader, writeHistogram, readHistogram
 from color_histogram.core.hist_common import colorCoordinates, colorDensities, rgbColors, clipLowDensity, range2ticks,\
-    densitySizes, range2lims
+    densitySizes, range2lims, computeHistogramSums, computeSparseHistogramSums, clipSparseLowDensity, sparseColorIDs,\
+    sparse2dense, meanColors, addHistogramSums
+from color_histogram.util import instrument
 
 
 ## Implementation of 3D color histograms.
 class Hist3D:
     ## Constructor
-    #  @param image          input image.
+    #  @param image          input image or ColorPixels shared with other histograms.
+    #                        None for an empty histogram with a fixed color_range (filled by update()).
+    #                        ColorPixels are used as they are: num_pixels, sampling, seed and mask are ignored.
     #  @param num_bins       target number of histogram bins.
     #  @param alpha          low density clip.
-    #  @param color_space    target color space. 'rgb' or 'Lab' or 'hsv'.
+    #  @param color_space    target color space. 'rgb', 'Lab', 'hsv', 'Luv', 'OKLab', 'OKLCh' (see core.color_space).
+    #  @param num_pixels     target number of pixels from the image. None for all pixels.
+    #  @param sampling       pixel sampling method. 'stride' or 'random' or 'grid'.
+    #  @param seed           random seed for 'random' and 'grid' sampling.
+    #  @param color_range    None for the range of the image pixels, or a fixed range: 'native' or [c_min, c_max].
+    #  @param storage        histogram storage. 'dense' for num_bins^3 arrays,
+    #                        'sparse' for sorted flat bin IDs, counts and mean colors of the occupied bins.
+    #  @param mask           None for all pixels, boolean mask or alpha threshold. See ColorPixels.
+    #  @param quantized_lut  approximate binning of uint8 images via the quantized RGB table. See core.bin_lut.
     def __init__(self, image,
-                 num_bins=16, alpha=0.1, color_space='rgb'):
-        self._computeTargetPixels(image, color_space)
+                 num_bins=16, alpha=0.1, color_space='rgb',
+                 num_pixels=1000, sampling='stride', seed=None, color_range=None,
+                 storage='dense', mask=None, quantized_lut=False):
+        self._computeTargetPixels(image, color_space, num_pixels, sampling, seed, mask)
+        self._quantized_lut = quantized_lut
 
         self._num_bins = num_bins
         self._alpha = alpha
         self._color_space = color_space
 
-        self._computeColorRange()
+        self._storage = storage
+
+        self._computeColorRange(color_range)
         self._computeHistogram()
 
-        self._plotter = Hist3DPlot(self)
+        self._plotter = None
 
     ## Plot histogram with the given density size range.
     def plot(self, ax, density_size_range=[10, 100]):
-        self._plotter.plot(ax, density_size_range)
+        self._getPlotter().plot(ax, density_size_range)
 
     def colorSpace(self):
         return self._color_space
 
+    def storage(self):
+        return self._storage
+
     def colorIDs(self):
-        color_ids = np.where(self._histPositive())
-        return color_ids
+        return self._cached("color_ids", self._computeColorIDs)
 
     def colorCoordinates(self):
-        color_ids = self.colorIDs()
-        num_bins = self._num_bins
-        color_range = self._color_range
-        return colorCoordinates(color_ids, num_bins, color_range)
+        return self._cached("color_coordinates",
+                            lambda: colorCoordinates(self.colorIDs(), self._num_bins, self._color_range))
 
     def colorDensities(self):
-        return colorDensities(self._hist_bins)
+        return self._cached("color_densities", lambda: colorDensities(self._hist_bins))
 
     def rgbColors(self):
-        return rgbColors(self._hist_bins, self._color_bins)
+        return self._cached("rgb_colors", lambda: rgbColors(self._hist_bins, self._color_bins))
 
     def colorRange(self):
         return self._color_range
 
-    def _computeTargetPixels(self, image, color_space):
-        color_pixels = ColorPixels(image)
-        self._pixels = color_pixels.pixels(color_space)
-        self._rgb_pixels = color_pixels.rgb()
-
-    def _computeColorRange(self):
-        pixels = self._pixels
-        cs = pixels.shape[1]
-
-        c_min = np.zeros(cs)
-        c_max = np.zeros(cs)
-        for ci in xrange(cs):
-            c_min[ci] = np.min(pixels[:, ci])
-            c_max[ci] = np.max(pixels[:, ci])
+    def numBins(self):
+        return self._num_bins
+
+    def channels(self):
+        return [0, 1, 2]
+
+    def alpha(self):
+        return self._alpha
+
+    ## Histogram counts: num_bins^3 array for the dense storage, counts of the occupied bins for the sparse storage.
+    def histBins(self):
+        return self._hist_bins
+
+    ## Mean RGB colors of the bins with the same layout as histBins.
+    def colorBins(self):
+        return self._color_bins
+
+    ## Sorted flat bin IDs of the sparse storage. None for the dense storage.
+    def binIDs(self):
+        return self._bin_ids
+
+    ## Dense counts and mean RGB colors for both storages.
+    def denseBins(self):
+        if self._bin_ids is None:
+            return self._hist_bins, self._color_bins
+        return sparse2dense(self._bin_ids, self._hist_bins, self._color_bins, self._num_bins, 3)
+
+    ## Header of the histogram for serialization.
+    def histHeader(self):
+        return HistHeader(3, self._num_bins, self._alpha, self._color_space, [0, 1, 2], self._color_range)
+
+    ## Raw counts and RGB color sums before the low density clip.
+    #  @return  (bin_ids, hist_bins, color_sums). bin_ids is None for the dense storage.
+    def histSums(self):
+        return self._raw_bin_ids, self._raw_bins, self._color_sums
+
+    ## Accumulate the pixels of the image into the histogram.
+    #
+    #  Requires a fixed color_range, so that all the images share the same bins.
+    #  Only the raw counts and color sums are kept, and the low density clip is applied to the total.
+    #  @param image   input image or ColorPixels.
+    #  @param mask    None for all pixels, boolean mask or alpha threshold. See the constructor.
+    def update(self, image, mask=None):
+        if not self._fixed_range:
+            raise ValueError("update requires a fixed color_range")
+
+        color_pixels = toColorPixels(image, self._num_pixels, self._sampling, self._seed, mask)
+        self._addSums(self._computeSums(color_pixels))
+        return self
+
+    ## Merge the other histogram with the same bin layout into the histogram.
+    def merge(self, hist):
+        if not self.histHeader().isCompatible(hist.histHeader()):
+            raise ValueError("Histogram bin layout does not match")
+
+        self._addSums(hist.histSums())
+        return self
+
+    ## Save the histogram in the compact binary format.
+    #
+    #  The raw counts before the low density clip are saved, so the loaded histogram can be updated and merged.
+    def save(self, file_path):
+        bin_ids, hist_bins, color_sums = self.histSums()
+        writeHistogram(file_path, self.histHeader(), hist_bins, meanColors(hist_bins, color_sums), bin_ids)
+
+    ## Load the histogram saved by save().
+    @staticmethod
+    def load(file_path):
+        header, hist_bins, color_bins, bin_ids = readHistogram(file_path, 3)
+        storage = "dense" if bin_ids is None else "sparse"
+        hist3D = Hist3D(None, header.num_bins, header.alpha, header.color_space,
+                        color_range=header.colorRange(), storage=storage)
+        hist3D._setSums((bin_ids, hist_bins, color_bins * hist_bins[..., None]))
+        return hist3D
+
+    def _computeTargetPixels(self, image, color_space, num_pixels, sampling, seed, mask):
+        self._color_pixels = toColorPixels(image, num_pixels, sampling, seed, mask)
+        self._num_pixels = num_pixels
+        self._sampling = sampling
+        self._seed = seed
+
+    def _computeColorRange(self, color_range):
+        if color_range is None and self._color_pixels is None:
+            raise ValueError("color_range is required for an empty histogram")
+
+        if color_range is None:
+            pixels = self._color_pixels.pixels(self._color_space)
+            cs = pixels.shape[1]
+
+            c_min = np.zeros(cs)
+            c_max = np.zeros(cs)
+            for ci in xrange(cs):
+                c_min[ci] = np.min(pixels[:, ci])
+                c_max[ci] = np.max(pixels[:, ci])
+        elif isinstance(color_range, basestring):
+            c_min, c_max = nativeColorRange(self._color_space, [0, 1, 2])
+        else:
+            c_min, c_max = np.float32(color_range[0]), np.float32(color_range[1])
 
         self._color_range = [c_min, c_max]
+        self._fixed_range = color_range is not None
 
     def _computeHistogram(self):
-        pixels = self._pixels
-        num_bins = self._num_bins
-        c_min, c_max = self._color_range
+        if self._storage not in ["dense", "sparse"]:
+            raise ValueError("Unknown histogram storage: %s" % self._storage)
+
+        self._setSums(self._computeSums(self._color_pixels))
 
-        hist_bins = np.zeros((num_bins, num_bins, num_bins), dtype=np.float32)
-        color_bins = np.zeros((num_bins, num_bins, num_bins, 3), dtype=np.float32)
+    ## Raw counts and RGB color sums of the pixels with the histogram storage.
+    def _computeSums(self, color_pixels):
+        with instrument.span("hist3D.sums", color_space=self._color_space, num_bins=self._num_bins) as span:
+            color_ids, rgb_pixels = pixelBinIDs(color_pixels, self._color_space, [0, 1, 2],
+                                                self._num_bins, self._color_range, self._fixed_range,
+                                                self._quantized_lut)
+            span.count("pixels_binned", len(color_ids))
+            if self._storage == "sparse":
+                return computeSparseHistogramSums(color_ids, rgb_pixels, self._num_bins)
 
-        color_ids = (num_bins - 1) * (pixels - c_min) / (c_max - c_min)
-        color_ids = np.int32(color_ids)
+            hist_bins, color_sums = computeHistogramSums(color_ids, rgb_pixels, self._num_bins)
+        return None, hist_bins, color_sums
 
-        for pi, color_id in enumerate(color_ids):
-            hist_bins[color_id[0], color_id[1], color_id[2]] += 1
-            color_bins[color_id[0], color_id[1], color_id[2]] += self._rgb_pixels[pi]
+    def _setSums(self, sums):
+        self._raw_bin_ids, self._raw_bins, self._color_sums = sums
+        self._updateBins()
 
-        self._hist_bins = hist_bins
-        hist_positive = self._hist_bins > 0.0
+    def _addSums(self, sums):
+        self._setSums(addHistogramSums(self.histSums(), sums))
 
-        for ci in xrange(3):
-            color_bins[hist_positive, ci] /= self._hist_bins[hist_positive]
+    ## Clipped histogram bins and mean colors from the raw counts and color sums.
+    def _updateBins(self):
+        with instrument.span("hist3D.bins", num_bins=self._num_bins) as span:
+            self._cache = {}
+            self._bin_ids = self._raw_bin_ids
+            self._hist_bins = np.array(self._raw_bins)
+            self._color_bins = meanColors(self._raw_bins, self._color_sums)
 
-        self._color_bins = color_bins
+            self._clipLowDensity()
 
-        self._clipLowDensity()
+            if instrument.enabled():
+                span.count("bins_occupied", int(np.count_nonzero(self._hist_bins)))
+                span.count("bytes_allocated", self._hist_bins.nbytes + self._color_bins.nbytes)
 
     def _clipLowDensity(self):
-        clipLowDensity(self._hist_bins, self._color_bins, self._alpha)
+        if self._bin_ids is None:
+            clipLowDensity(self._hist_bins, self._color_bins, self._alpha)
+            return
+
+        sparse_bins = clipSparseLowDensity(self._bin_ids, self._hist_bins, self._color_bins,
+                                           self._alpha, self._num_bins ** 3)
+        self._bin_ids, self._hist_bins, self._color_bins = sparse_bins
+
+    ## Plotter constructed on the first plot() call.
+    def _getPlotter(self):
+        if self._plotter is None:
+            self._plotter = Hist3DPlot(self)
+        return self._plotter
+
+    ## Cached value of the bins, invalidated by the bin updates.
+    def _cached(self, key, compute_func):
+        value = self._cache.get(key)
+        if value is None:
+            value = compute_func()
+            self._cache[key] = value
+        return value
+
+    def _computeColorIDs(self):
+        if self._bin_ids is not None:
+            return sparseColorIDs(self._bin_ids, self._num_bins, 3)
+        return np.where(self._histPositive())
 
     def _histPositive(self):
         return self._hist_bins > 0.0
@@ -131,9 +276,10 @@ class Hist3DPlot:
     def _axisSetting(self, ax):
         color_space = self._hist3D.colorSpace()
 
-        ax.set_xlabel(color_space[0])
-        ax.set_ylabel(color_space[1])
-        ax.set_zlabel(color_space[2])
+        labels = colorSpace(color_space).labels()
+        ax.set_xlabel(labels[0])
+        ax.set_ylabel(labels[1])
+        ax.set_zlabel(labels[2])
 
         color_range = self._hist3D.colorRange()
         tick_range = np.array(color_range).T
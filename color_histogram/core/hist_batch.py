@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.core.hist_batch
+#
+#  Implementation of batched 3D color histograms.
+#  @author      tody
+#  @date        2026/10/18
+
+import numpy as np
+
+from color_histogram.core.color_pixels import ColorPixels, samplePixelIDs, convertRGBPixels, nativeColorRange
+from color_histogram.core.hist_common import colorBinIDs, flatBinIDs, accumulateBins, meanColors
+from color_histogram.cv.image import to32F
+
+
+## Implementation of batched 3D color histograms.
+#
+#  All histograms share a single color range,
+#  and are accumulated in one vectorized pass over the pixels of all images.
+class HistogramBatch:
+    ## Constructor
+    #  @param images         N x H x W x 3 image stack or list of images.
+    #  @param num_bins       target number of histogram bins.
+    #  @param alpha          low density clip.
+    #  @param color_space    target color space. 'rgb', 'Lab', 'hsv', 'Luv', 'OKLab', 'OKLCh' (see core.color_space).
+    #  @param num_pixels     target number of pixels from each image. None for all pixels.
+    #  @param sampling       pixel sampling method. 'stride' or 'random' or 'grid'.
+    #  @param seed           random seed for 'random' and 'grid' sampling.
+    #  @param color_range    None for the color range of all the image pixels,
+    #                        'native' for the native range of the color space, or [c_min, c_max].
+    def __init__(self, images,
+                 num_bins=16, alpha=0.1, color_space='rgb',
+                 num_pixels=1000, sampling='stride', seed=None, color_range=None):
+        self._num_bins = num_bins
+        self._alpha = alpha
+        self._color_space = color_space
+
+        self._computeTargetPixels(images, num_pixels, sampling, seed)
+        self._computeColorRange(color_range)
+        self._computeHistograms()
+
+    def numImages(self):
+        return self._num_images
+
+    def numBins(self):
+        return self._num_bins
+
+    def colorSpace(self):
+        return self._color_space
+
+    def colorRange(self):
+        return self._color_range
+
+    ## N x num_bins x num_bins x num_bins pixel counts.
+    def histBins(self):
+        return self._hist_bins
+
+    ## N x num_bins x num_bins x num_bins x 3 mean RGB colors.
+    def colorBins(self):
+        return self._color_bins
+
+    ## N x num_bins^3 pixel counts.
+    def flatHistBins(self):
+        return self._hist_bins.reshape(self._num_images, -1)
+
+    ## Mean RGB colors of the image stack (N x 3).
+    def meanColors(self):
+        hist_bins = self.flatHistBins()
+        color_bins = self._color_bins.reshape(self._num_images, -1, 3)
+        num_pixels = np.maximum(np.sum(hist_bins, axis=1), 1.0)
+        return np.einsum('ij,ijk->ik', hist_bins, color_bins) / num_pixels[:, None]
+
+    def _computeTargetPixels(self, images, num_pixels, sampling, seed):
+        if isinstance(images, np.ndarray) and images.ndim == 4:
+            self._stackPixels(images, num_pixels, sampling, seed)
+        else:
+            self._listPixels(images, num_pixels, sampling, seed)
+
+    ## Sample the same pixel positions from all images and convert them at once.
+    def _stackPixels(self, images, num_pixels, sampling, seed):
+        num_images, h, w = images.shape[:3]
+        pixel_ids = samplePixelIDs((h, w), num_pixels, sampling, seed)
+
+        pixels = images.reshape(num_images, h * w, -1)[:, :, :3]
+        if pixel_ids is not None:
+            pixels = pixels[:, pixel_ids]
+
+        rgb_pixels = to32F(np.ascontiguousarray(pixels)).reshape(-1, 3)
+        num_image_pixels = rgb_pixels.shape[0] // num_images
+
+        self._num_images = num_images
+        self._rgb_pixels = rgb_pixels
+        self._pixels = convertRGBPixels(rgb_pixels, self._color_space)
+        self._image_ids = np.repeat(np.arange(num_images), num_image_pixels)
+
+    def _listPixels(self, images, num_pixels, sampling, seed):
+        color_pixels = [ColorPixels(image, num_pixels, sampling, seed) for image in images]
+
+        self._num_images = len(color_pixels)
+        self._rgb_pixels = np.concatenate([cp.rgb() for cp in color_pixels])
+        self._pixels = convertRGBPixels(self._rgb_pixels, self._color_space)
+        self._image_ids = np.repeat(np.arange(self._num_images),
+                                    [cp.numPixels() for cp in color_pixels])
+
+    def _computeColorRange(self, color_range):
+        if color_range is None:
+            pixels = self._pixels
+            self._color_range = [np.min(pixels, axis=0), np.max(pixels, axis=0)]
+        elif isinstance(color_range, basestring):
+            self._color_range = nativeColorRange(self._color_space)
+        else:
+            self._color_range = [np.float32(color_range[0]), np.float32(color_range[1])]
+
+    def _computeHistograms(self):
+        num_bins = self._num_bins
+        num_cells = num_bins ** 3
+        num_images = self._num_images
+
+        color_ids = colorBinIDs(self._pixels, num_bins, self._color_range)
+        bin_ids = self._image_ids * num_cells + flatBinIDs(color_ids, num_bins)
+
+        hist_bins, color_sums = accumulateBins(bin_ids, self._rgb_pixels, num_images * num_cells)
+        color_bins = meanColors(hist_bins, color_sums)
+
+        hist_shape = (num_images, num_bins, num_bins, num_bins)
+        self._hist_bins = hist_bins.reshape(hist_shape)
+        self._color_bins = color_bins.reshape(hist_shape + (3,))
+
+        self._clipLowDensity()
+
+    ## Clip low density bins for each image.
+    def _clipLowDensity(self):
+        hist_bins = self.flatHistBins()
+        color_bins = self._color_bins.reshape(self._num_images, -1, 3)
+
+        density_mean = np.mean(hist_bins, axis=1)
+        low_density = hist_bins < (density_mean * self._alpha)[:, None]
+        hist_bins[low_density] = 0.0
+        color_bins[low_density] = 0.0
+
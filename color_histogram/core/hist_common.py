@@ -8,6 +8,185 @@
 import numpy as np
 
 
+## Scale and offset constants of the bin transform: bin_id = int(scale * (pixel - offset)).
+#
+#  Channels with an empty color range are mapped into the first bin.
+#  @param num_bins     number of histogram bins for each channel.
+#  @param color_range  [c_min, c_max] of the target channels.
+def binTransform(num_bins, color_range):
+    c_min = np.float32(color_range[0])
+    c_size = np.float32(color_range[1]) - c_min
+
+    c_positive = c_size > 0.0
+    scale = np.where(c_positive, (num_bins - 1) / np.where(c_positive, c_size, 1.0), 0.0)
+    return np.float32(scale), c_min
+
+
+## Integer bin IDs of the pixels for the given color range.
+#
+#  Pixels outside the color range are clipped into the first or last bin.
+#  @param pixels       (n x d) or (n) pixel values in the target color space.
+#  @param num_bins     number of histogram bins for each channel.
+#  @param color_range  [c_min, c_max] of the target channels.
+def colorBinIDs(pixels, num_bins, color_range):
+    scale, offset = binTransform(num_bins, color_range)
+
+    color_ids = pixels - offset
+    color_ids *= scale
+    color_ids = np.int32(color_ids)
+    np.clip(color_ids, 0, num_bins - 1, out=color_ids)
+    return color_ids
+
+
+## Flat bin indices for (n x d) or (n) integer bin IDs.
+def flatBinIDs(color_ids, num_bins):
+    if color_ids.ndim == 1:
+        return color_ids
+
+    num_dims = color_ids.shape[1]
+    return np.ravel_multi_index(color_ids.T, (num_bins,) * num_dims)
+
+
+## Accumulate pixel counts and RGB color sums for the flat bin indices.
+#  @param bin_ids      (n) flat bin indices.
+#  @param rgb_pixels   (n x 3) float32 or uint8 RGB colors of the pixels.
+#  @param num_cells    total number of histogram bins.
+#  @return             (num_cells) counts, (num_cells x 3) RGB color sums.
+def accumulateBins(bin_ids, rgb_pixels, num_cells):
+    hist_bins = np.float32(np.bincount(bin_ids, minlength=num_cells))
+
+    color_sums = np.empty((num_cells, 3), dtype=np.float32)
+    for ci in xrange(3):
+        color_sums[:, ci] = np.bincount(bin_ids, weights=rgb_pixels[:, ci], minlength=num_cells)
+
+    if rgb_pixels.dtype == np.uint8:
+        color_sums *= 1.0 / 255.0
+    return hist_bins, color_sums
+
+
+## Mean RGB colors from the accumulated counts and color sums.
+def meanColors(hist_bins, color_sums):
+    color_bins = np.zeros_like(color_sums)
+    hist_positive = hist_bins > 0.0
+    color_bins[hist_positive] = color_sums[hist_positive] / hist_bins[hist_positive, None]
+    return color_bins
+
+
+## Compute histogram bins and mean color bins in a single vectorized pass.
+#  @param color_ids    (n x d) or (n) integer bin IDs.
+#  @param rgb_pixels   (n x 3) RGB colors of the pixels.
+#  @param num_bins     number of histogram bins for each channel.
+#  @return             (num_bins^d) counts, (num_bins^d x 3) mean RGB colors.
+def computeHistogram(color_ids, rgb_pixels, num_bins):
+    hist_bins, color_sums = computeHistogramSums(color_ids, rgb_pixels, num_bins)
+    return hist_bins, meanColors(hist_bins, color_sums)
+
+
+## Compute raw histogram counts and RGB color sums in a single vectorized pass.
+#
+#  Counts and color sums can be added across images, unlike the mean colors.
+#  @return             (num_bins^d) counts, (num_bins^d x 3) RGB color sums.
+def computeHistogramSums(color_ids, rgb_pixels, num_bins):
+    num_dims = 1 if color_ids.ndim == 1 else color_ids.shape[1]
+    hist_shape = (num_bins,) * num_dims
+
+    bin_ids = flatBinIDs(color_ids, num_bins)
+    hist_bins, color_sums = accumulateBins(bin_ids, rgb_pixels, num_bins ** num_dims)
+
+    return hist_bins.reshape(hist_shape), color_sums.reshape(hist_shape + (3,))
+
+
+## Compute sparse histogram bins in a single vectorized pass.
+#
+#  Only the occupied bins are stored, without allocating num_bins^d arrays.
+#  @param color_ids    (n x d) integer bin IDs.
+#  @param rgb_pixels   (n x 3) RGB colors of the pixels.
+#  @param num_bins     number of histogram bins for each channel.
+#  @return             (k) sorted flat bin IDs, (k) counts, (k x 3) mean RGB colors of the occupied bins.
+def computeSparseHistogram(color_ids, rgb_pixels, num_bins):
+    occupied_ids, hist_bins, color_sums = computeSparseHistogramSums(color_ids, rgb_pixels, num_bins)
+    return occupied_ids, hist_bins, meanColors(hist_bins, color_sums)
+
+
+## Compute raw sparse histogram counts and RGB color sums of the occupied bins.
+#  @return             (k) sorted flat bin IDs, (k) counts, (k x 3) RGB color sums.
+def computeSparseHistogramSums(color_ids, rgb_pixels, num_bins):
+    bin_ids = flatBinIDs(color_ids, num_bins)
+    occupied_ids, bin_ids = np.unique(bin_ids, return_inverse=True)
+
+    hist_bins, color_sums = accumulateBins(bin_ids, rgb_pixels, len(occupied_ids))
+    return occupied_ids, hist_bins, color_sums
+
+
+## Merge two raw sparse histograms (sorted flat bin IDs, counts, RGB color sums).
+#  @return             (bin_ids, hist_bins, color_sums) of the union of the occupied bins.
+def mergeSparseSums(bin_ids, hist_bins, color_sums, other_ids, other_bins, other_sums):
+    merged_ids, merged_inverse = np.unique(np.concatenate((bin_ids, other_ids)), return_inverse=True)
+    num_merged = len(merged_ids)
+
+    merged_bins = np.bincount(merged_inverse, weights=np.concatenate((hist_bins, other_bins)),
+                              minlength=num_merged)
+
+    merged_sums = np.empty((num_merged, 3), dtype=np.float32)
+    for ci in xrange(3):
+        merged_sums[:, ci] = np.bincount(merged_inverse,
+                                         weights=np.concatenate((color_sums[:, ci], other_sums[:, ci])),
+                                         minlength=num_merged)
+    return merged_ids, np.float32(merged_bins), merged_sums
+
+
+## Add the other raw histogram sums into the raw histogram sums.
+#
+#  Raw sums are (bin_ids, hist_bins, color_sums) with flat bin IDs for the sparse storage,
+#  or (None, hist_bins, color_sums) for the dense storage. Dense sums are updated in place.
+#  @return             raw sums with the storage of the first sums.
+def addHistogramSums(sums, other_sums):
+    bin_ids, hist_bins, color_sums = sums
+    other_ids, other_bins, other_sums = other_sums
+
+    if bin_ids is None:
+        if other_ids is None:
+            hist_bins += other_bins
+            color_sums += other_sums
+        else:
+            hist_bins.reshape(-1)[other_ids] += other_bins
+            color_sums.reshape(-1, 3)[other_ids] += other_sums
+        return bin_ids, hist_bins, color_sums
+
+    if other_ids is None:
+        other_ids = np.flatnonzero(other_bins)
+        other_bins = other_bins.reshape(-1)[other_ids]
+        other_sums = other_sums.reshape(-1, 3)[other_ids]
+
+    return mergeSparseSums(bin_ids, hist_bins, color_sums, other_ids, other_bins, other_sums)
+
+
+## Clip low density bins of the sparse histogram, and drop them from the bin arrays.
+#  @param num_cells    total number of histogram bins including the empty bins.
+#  @return             (bin_ids, hist_bins, color_bins) of the remaining bins.
+def clipSparseLowDensity(bin_ids, hist_bins, color_bins, alpha, num_cells):
+    density_mean = np.sum(hist_bins) / float(num_cells)
+    high_density = hist_bins >= density_mean * alpha
+    return bin_ids[high_density], hist_bins[high_density], color_bins[high_density]
+
+
+## Color IDs (same as np.where) of the sparse histogram bins.
+def sparseColorIDs(bin_ids, num_bins, num_dims):
+    return np.unravel_index(bin_ids, (num_bins,) * num_dims)
+
+
+## Dense (num_bins^d) counts and (num_bins^d x 3) mean colors of the sparse histogram.
+def sparse2dense(bin_ids, hist_bins, color_bins, num_bins, num_dims):
+    hist_shape = (num_bins,) * num_dims
+    num_cells = num_bins ** num_dims
+
+    dense_hist_bins = np.zeros(num_cells, dtype=np.float32)
+    dense_color_bins = np.zeros((num_cells, 3), dtype=np.float32)
+    dense_hist_bins[bin_ids] = hist_bins
+    dense_color_bins[bin_ids] = color_bins
+    return dense_hist_bins.reshape(hist_shape), dense_color_bins.reshape(hist_shape + (3,))
+
+
 def colorCoordinates(color_ids, num_bins, color_range):
     color_ids = np.array(color_ids).T
     c_min, c_max = color_range
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.core.hist_integral
+#
+#  Integral color histograms for region (rectangle) histograms.
+#
+#  Bin counts are accumulated over a grid of cells and integrated over the rows and columns once,
+#  so the histogram of any cell-aligned rectangle is 4 lookups of num_bins^d counts.
+#  Memory is (h / cell_size + 1) x (w / cell_size + 1) x num_bins^d counts.
+#  @author      tody
+#  @date        2026/10/18
+
+import numpy as np
+
+from color_histogram.core.color_pixels import ColorPixels, nativeColorRange
+from color_histogram.core.bin_lut import pixelBinIDs
+from color_histogram.core.hist_common import flatBinIDs
+
+
+## Integral color histogram of an image.
+class IntegralHist:
+    ## Constructor
+    #  @param image          input image. All the pixels are used.
+    #  @param num_bins       target number of histogram bins for each channel.
+    #  @param color_space    target color space. 'rgb', 'Lab', 'hsv', 'Luv', 'OKLab', 'OKLCh' (see core.color_space).
+    #  @param channels       target color channels. [0, 1, 2] for 3D histograms, [0, 1] for 2D, [0] for 1D.
+    #  @param cell_size      cell size in pixels. Rectangles are aligned to the cell grid.
+    #  @param color_range    'native' for the native range of the color space, or [c_min, c_max].
+    #  @param quantized_lut  approximate binning of uint8 images via the quantized RGB table. See core.bin_lut.
+    def __init__(self, image, num_bins=8, color_space='rgb', channels=[0, 1, 2],
+                 cell_size=4, color_range='native', quantized_lut=False):
+        self._num_bins = num_bins
+        self._quantized_lut = quantized_lut
+        self._color_space = color_space
+        self._channels = list(channels)
+        self._cell_size = cell_size
+        self._image_size = image.shape[:2]
+
+        self._computeColorRange(color_range)
+        self._computeIntegral(ColorPixels(image, num_pixels=None))
+
+    def numBins(self):
+        return self._num_bins
+
+    def colorSpace(self):
+        return self._color_space
+
+    def channels(self):
+        return self._channels
+
+    def colorRange(self):
+        return self._color_range
+
+    def cellSize(self):
+        return self._cell_size
+
+    ## (h, w) of the image.
+    def imageSize(self):
+        return self._image_size
+
+    ## (grid_h, grid_w) of the cell grid.
+    def gridSize(self):
+        return self._integral.shape[0] - 1, self._integral.shape[1] - 1
+
+    ## Histogram counts (num_bins^d) of the rectangle.
+    #  @param rect   (x, y, w, h) in pixels.
+    def rectHistogram(self, rect):
+        hist_bins = self.rectHistograms([rect])[0]
+        return hist_bins.reshape((self._num_bins,) * len(self._channels))
+
+    ## Flat histogram counts (n x num_bins^d) of the rectangles.
+    #
+    #  Rows have the same layout as the flat histograms of color_histogram.core.distance.
+    #  @param rects  (n x 4) rectangles of (x, y, w, h) in pixels.
+    def rectHistograms(self, rects):
+        rects = np.array(rects, dtype=np.float64).reshape(-1, 4)
+        grid_h, grid_w = self.gridSize()
+
+        x0 = self._cellIDs(rects[:, 0], grid_w)
+        y0 = self._cellIDs(rects[:, 1], grid_h)
+        x1 = np.maximum(self._cellIDs(rects[:, 0] + rects[:, 2], grid_w), x0)
+        y1 = np.maximum(self._cellIDs(rects[:, 1] + rects[:, 3], grid_h), y0)
+
+        integral = self._integral
+        return integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+
+    ## Histograms of the (grid_h x grid_w) regions dividing the image.
+    #  @return   (grid_h * grid_w) rectangles (x, y, w, h), (grid_h * grid_w x num_bins^d) counts.
+    def gridHistograms(self, grid_h, grid_w):
+        h, w = self._image_size
+        ys = np.linspace(0, h, grid_h + 1)
+        xs = np.linspace(0, w, grid_w + 1)
+
+        y0, x0 = np.meshgrid(ys[:-1], xs[:-1], indexing='ij')
+        y1, x1 = np.meshgrid(ys[1:], xs[1:], indexing='ij')
+        rects = np.dstack((x0.ravel(), y0.ravel(), (x1 - x0).ravel(), (y1 - y0).ravel()))[0]
+        return rects, self.rectHistograms(rects)
+
+    ## Histograms of the sliding windows.
+    #  @param window_size  (window_w, window_h) in pixels.
+    #  @param step         (step_x, step_y) in pixels.
+    #  @return             (n) rectangles (x, y, w, h), (n x num_bins^d) counts.
+    def windowHistograms(self, window_size, step):
+        h, w = self._image_size
+        window_w, window_h = window_size
+        step_x, step_y = step
+
+        ys = np.arange(0, max(h - window_h, 0) + 1, step_y)
+        xs = np.arange(0, max(w - window_w, 0) + 1, step_x)
+
+        y0, x0 = np.meshgrid(ys, xs, indexing='ij')
+        rects = np.zeros((y0.size, 4))
+        rects[:, 0] = x0.ravel()
+        rects[:, 1] = y0.ravel()
+        rects[:, 2] = window_w
+        rects[:, 3] = window_h
+        return rects, self.rectHistograms(rects)
+
+    def _computeColorRange(self, color_range):
+        if isinstance(color_range, basestring):
+            c_min, c_max = nativeColorRange(self._color_space, self._channels)
+        else:
+            c_min = np.float32(color_range[0]).reshape(-1)
+            c_max = np.float32(color_range[1]).reshape(-1)
+        self._color_range = [c_min, c_max]
+
+    ## Integral of the cell bin counts: (grid_h + 1) x (grid_w + 1) x num_bins^d.
+    def _computeIntegral(self, color_pixels):
+        h, w = self._image_size
+        cell_size = self._cell_size
+        grid_h = (h + cell_size - 1) // cell_size
+        grid_w = (w + cell_size - 1) // cell_size
+        num_cells = self._num_bins ** len(self._channels)
+
+        color_ids, _ = pixelBinIDs(color_pixels, self._color_space, self._channels,
+                                   self._num_bins, self._color_range, True, self._quantized_lut)
+        bin_ids = flatBinIDs(color_ids.astype(np.int64), self._num_bins)
+
+        ys, xs = np.divmod(np.arange(h * w, dtype=np.int64), w)
+        grid_ids = (ys // cell_size) * grid_w + xs // cell_size
+
+        cell_bins = np.bincount(grid_ids * num_cells + bin_ids, minlength=grid_h * grid_w * num_cells)
+
+        integral = np.zeros((grid_h + 1, grid_w + 1, num_cells), dtype=np.int32)
+        integral[1:, 1:] = cell_bins.reshape(grid_h, grid_w, num_cells)
+        np.cumsum(integral, axis=0, out=integral)
+        np.cumsum(integral, axis=1, out=integral)
+        self._integral = integral
+
+    def _cellIDs(self, pixel_positions, grid_size):
+        cell_ids = np.rint(pixel_positions / float(self._cell_size)).astype(np.int64)
+        return np.clip(cell_ids, 0, grid_size)
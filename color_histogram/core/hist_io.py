@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.core.hist_io
+#
+#  Compact binary format for color histograms.
+#
+#  Histogram file (.chist):
+#  * 64 bytes header: magic 'CHST', version, dims, flags, bins, alpha,
+#    number of entries, color space, channels, color range.
+#  * dense:  float32 counts (bins^d), float32 mean RGB colors (bins^d x 3).
+#  * sparse: uint32 flat bin IDs (k), float32 counts (k), float32 mean RGB colors (k x 3).
+#  Counts are the raw counts before the low density clip, which is applied again on load.
+#
+#  Histogram store file (.chstore):
+#  * 64 bytes header with magic 'CHSS', shared by all the histograms.
+#  * uint64 number of histograms.
+#  * fixed size records of float32 counts (bins^d) and float32 mean RGB colors (bins^d x 3).
+#  Records can be scanned via np.memmap without deserializing the histograms.
+#  @author      tody
+#  @date        2026/10/18
+
+import struct
+
+import numpy as np
+
+_hist_magic = "CHST"
+_store_magic = "CHSS"
+_version = 1
+
+## magic, version, dims, flags, bins, alpha, entries, color space, channels, pad, c_min, c_max.
+_header_struct = struct.Struct("<4sHBBIfI16s3bx3f3f")
+_count_struct = struct.Struct("<Q")
+
+_flag_sparse = 1
+
+
+## Header of the serialized histograms.
+class HistHeader:
+    ## Constructor
+    #  @param num_dims       number of histogram dimensions (1, 2, 3).
+    #  @param num_bins       number of histogram bins for each channel.
+    #  @param alpha          low density clip.
+    #  @param color_space    color space name.
+    #  @param channels       target color channels.
+    #  @param color_range    [c_min, c_max] of the target channels.
+    #  @param sparse         True for the sparse storage.
+    #  @param num_entries    number of stored bins. None for all bins.
+    def __init__(self, num_dims, num_bins, alpha, color_space, channels, color_range,
+                 sparse=False, num_entries=None):
+        self.num_dims = num_dims
+        self.num_bins = num_bins
+        self.alpha = alpha
+        self.color_space = color_space
+        self.channels = list(channels)
+        self.color_range = [np.float32(color_range[0]).reshape(-1), np.float32(color_range[1]).reshape(-1)]
+        self.sparse = sparse
+        self.num_entries = self.numCells() if num_entries is None else num_entries
+
+    ## Total number of histogram bins.
+    def numCells(self):
+        return self.num_bins ** self.num_dims
+
+    ## Color range for the histogram constructors (scalars for 1D).
+    def colorRange(self):
+        c_min, c_max = self.color_range
+        if self.num_dims == 1:
+            return [c_min[0], c_max[0]]
+        return [c_min, c_max]
+
+    ## True if the histograms have the same bin layout.
+    def isCompatible(self, header):
+        return (self.num_dims == header.num_dims and
+                self.num_bins == header.num_bins and
+                self.color_space == header.color_space and
+                self.channels == header.channels and
+                np.allclose(self.color_range[0], header.color_range[0]) and
+                np.allclose(self.color_range[1], header.color_range[1]))
+
+    def pack(self, magic=_hist_magic):
+        channels = self.channels + [-1] * (3 - self.num_dims)
+        c_min = _pad3(self.color_range[0])
+        c_max = _pad3(self.color_range[1])
+        flags = _flag_sparse if self.sparse else 0
+        return _header_struct.pack(magic, _version, self.num_dims, flags,
+                                   self.num_bins, self.alpha, self.num_entries,
+                                   self.color_space, *(channels + c_min + c_max))
+
+    @staticmethod
+    def unpack(data, magic=_hist_magic):
+        if len(data) < _header_struct.size:
+            raise IOError("Truncated histogram header")
+
+        values = _header_struct.unpack(data[:_header_struct.size])
+        file_magic, version, num_dims, flags, num_bins, alpha, num_entries, color_space = values[:8]
+
+        if file_magic != magic:
+            raise IOError("Not a histogram file: magic %r" % file_magic)
+        if version > _version:
+            raise IOError("Unsupported histogram file version: %s" % version)
+
+        channels = list(values[8:8 + num_dims])
+        c_min = values[11:11 + num_dims]
+        c_max = values[14:14 + num_dims]
+        return HistHeader(num_dims, num_bins, alpha, color_space.rstrip("\0"), channels, [c_min, c_max],
+                          sparse=bool(flags & _flag_sparse), num_entries=num_entries)
+
+
+## Write histogram bins into the file.
+#  @param bin_ids   flat bin IDs of the sparse storage. None for the dense storage.
+def writeHistogram(file_path, header, hist_bins, color_bins, bin_ids=None):
+    header.sparse = bin_ids is not None
+    header.num_entries = hist_bins.size
+
+    with open(file_path, "wb") as f:
+        f.write(header.pack())
+        if bin_ids is not None:
+            np.asarray(bin_ids, dtype="<u4").tofile(f)
+        np.asarray(hist_bins, dtype="<f4").tofile(f)
+        np.asarray(color_bins, dtype="<f4").tofile(f)
+
+
+## Read histogram bins from the file.
+#  @param num_dims  expected number of histogram dimensions. None for any.
+#  @return          (header, hist_bins, color_bins, bin_ids). bin_ids is None for the dense storage.
+def readHistogram(file_path, num_dims=None):
+    with open(file_path, "rb") as f:
+        header = HistHeader.unpack(f.read(_header_struct.size))
+
+        if num_dims is not None and header.num_dims != num_dims:
+            raise IOError("Expected %sD histogram, found %sD" % (num_dims, header.num_dims))
+
+        num_entries = header.num_entries
+        bin_ids = None
+        if header.sparse:
+            bin_ids = _readArray(f, "<u4", num_entries)
+        hist_bins = _readArray(f, "<f4", num_entries)
+        color_bins = _readArray(f, "<f4", 3 * num_entries).reshape(-1, 3)
+
+    if not header.sparse:
+        hist_shape = (header.num_bins,) * header.num_dims
+        hist_bins = hist_bins.reshape(hist_shape)
+        color_bins = color_bins.reshape(hist_shape + (3,))
+    return header, hist_bins, color_bins, bin_ids
+
+
+## Container file of histograms with the same bin layout, opened via np.memmap.
+class HistogramStore:
+    ## Constructor
+    #  @param file_path   histogram store file created by createHistogramStore.
+    #  @param mode        np.memmap mode. 'r' for read only, 'r+' for updating records.
+    def __init__(self, file_path, mode="r"):
+        self._file_path = file_path
+
+        with open(file_path, "rb") as f:
+            self._header = HistHeader.unpack(f.read(_header_struct.size), _store_magic)
+            num_histograms = _count_struct.unpack(f.read(_count_struct.size))[0]
+
+        # np.memmap can not map zero records, so an empty store has empty in-memory records.
+        self._records = np.zeros(0, dtype=storeRecordType(self._header))
+        if num_histograms > 0:
+            self._records = np.memmap(file_path, dtype=storeRecordType(self._header), mode=mode,
+                                      offset=_storeOffset(), shape=(num_histograms,))
+
+    def header(self):
+        return self._header
+
+    def numHistograms(self):
+        return self._records.shape[0]
+
+    def __len__(self):
+        return self.numHistograms()
+
+    ## (N x bins^d) memory-mapped counts.
+    def histBins(self):
+        return self._records["hist_bins"]
+
+    ## (N x bins^d x 3) memory-mapped mean RGB colors.
+    def colorBins(self):
+        return self._records["color_bins"]
+
+    ## (hist_bins, color_bins) of the i-th histogram with the dense bin shape.
+    def bins(self, i):
+        hist_shape = (self._header.num_bins,) * self._header.num_dims
+        record = self._records[i]
+        return record["hist_bins"].reshape(hist_shape), record["color_bins"].reshape(hist_shape + (3,))
+
+    ## Flush the changes of 'r+' mode and release the memory map.
+    def close(self):
+        if isinstance(self._records, np.memmap) and self._records.mode != "r":
+            self._records.flush()
+        self._records = np.zeros(0, dtype=self._records.dtype)
+
+
+## Record type of the histogram store.
+def storeRecordType(header):
+    num_cells = header.numCells()
+    return np.dtype([("hist_bins", "<f4", (num_cells,)),
+                     ("color_bins", "<f4", (num_cells, 3))])
+
+
+## Create a histogram store file with the shared header.
+def createHistogramStore(file_path, header):
+    header.sparse = False
+    header.num_entries = header.numCells()
+
+    with open(file_path, "wb") as f:
+        f.write(header.pack(_store_magic))
+        f.write(_count_struct.pack(0))
+
+
+## Append dense histogram bins to the histogram store file.
+#  @param bins_list   list of (hist_bins, color_bins) with the store bin layout.
+#  @return            number of histograms in the store.
+def appendHistogramStore(file_path, bins_list):
+    with open(file_path, "r+b") as f:
+        header = HistHeader.unpack(f.read(_header_struct.size), _store_magic)
+        num_histograms = _count_struct.unpack(f.read(_count_struct.size))[0]
+
+        records = np.zeros(len(bins_list), dtype=storeRecordType(header))
+        for ri, (hist_bins, color_bins) in enumerate(bins_list):
+            records["hist_bins"][ri] = np.ravel(hist_bins)
+            records["color_bins"][ri] = np.reshape(color_bins, (-1, 3))
+
+        record_size = records.dtype.itemsize
+        f.seek(_storeOffset() + num_histograms * record_size)
+        records.tofile(f)
+
+        num_histograms += len(bins_list)
+        f.seek(_header_struct.size)
+        f.write(_count_struct.pack(num_histograms))
+    return num_histograms
+
+
+## Save histograms with the same bin layout into a new histogram store file.
+#  @param hists       list of Hist1D, Hist2D or Hist3D.
+def saveHistogramStore(file_path, hists):
+    createHistogramStore(file_path, hists[0].histHeader())
+    return appendHistograms(file_path, hists)
+
+
+## Append histograms to the histogram store file.
+#  @param hists       list of Hist1D, Hist2D or Hist3D with the store bin layout.
+#  @return            number of histograms in the store.
+def appendHistograms(file_path, hists):
+    with open(file_path, "rb") as f:
+        header = HistHeader.unpack(f.read(_header_struct.size), _store_magic)
+
+    for hist in hists:
+        if not header.isCompatible(hist.histHeader()):
+            raise ValueError("Histogram bin layout does not match the store")
+
+    return appendHistogramStore(file_path, [hist.denseBins() for hist in hists])
+
+
+def _storeOffset():
+    return _header_struct.size + _count_struct.size
+
+
+def _readArray(f, dtype, count):
+    data = np.fromfile(f, dtype=dtype, count=count)
+    if data.size != count:
+        raise IOError("Truncated histogram file")
+    return data
+
+
+def _pad3(values):
+    values = [float(v) for v in values]
+    return values + [0.0] * (3 - len(values))
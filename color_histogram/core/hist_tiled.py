@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.core.hist_tiled
+#
+#  Tiled (out-of-core) color histograms for very large images.
+#
+#  The image is processed in tiles: each tile is sampled, converted and binned,
+#  then its counts and color sums are accumulated into a single histogram by update().
+#  With a memory-mapped input (see color_histogram.io_util.image.loadImageMemmap),
+#  the peak memory depends on the tile size only, not on the image size.
+#  @author      tody
+#  @date        2026/10/18
+
+from color_histogram.core.color_pixels import ColorPixels
+from color_histogram.core.hist_3d import Hist3D
+
+
+## Tile views of the image.
+#  @param image        (h x w) or (h x w x cs) image, e.g. np.memmap.
+#  @param tile_shape   (tile_h, tile_w). tile_w=None for full width strips (contiguous for C-order images).
+#  @return             generator of (y, x, tile view).
+def imageTiles(image, tile_shape=(256, None)):
+    h, w = image.shape[:2]
+    tile_h, tile_w = tile_shape
+    tile_w = w if tile_w is None else tile_w
+
+    for y in xrange(0, h, tile_h):
+        for x in xrange(0, w, tile_w):
+            yield y, x, image[y:y + tile_h, x:x + tile_w]
+
+
+## Accumulate the image tile by tile into the histogram.
+#  @param hist          Hist1D, Hist2D or Hist3D with a fixed color range.
+#  @param image         (h x w) or (h x w x cs) image, e.g. np.memmap.
+#  @param tile_shape    (tile_h, tile_w) of the tiles.
+#  @param num_pixels    target number of pixels from the whole image, distributed to the tiles by their sizes.
+#                       None for all pixels.
+#  @param sampling      pixel sampling method in each tile. 'stride' or 'random' or 'grid'.
+#  @param seed          random seed for 'random' and 'grid' sampling.
+#  @return              the given histogram.
+def updateTiled(hist, image, tile_shape=(256, None), num_pixels=None, sampling='stride', seed=None):
+    h, w = image.shape[:2]
+    total = float(h * w)
+
+    for y, x, tile in imageTiles(image, tile_shape):
+        tile_pixels = None
+        if num_pixels is not None:
+            tile_pixels = int(round(num_pixels * tile.shape[0] * tile.shape[1] / total))
+            if tile_pixels == 0:
+                continue
+
+        hist.update(ColorPixels(tile, tile_pixels, sampling, seed))
+    return hist
+
+
+## Compute Hist3D of the image tile by tile.
+#  @param image          (h x w) or (h x w x cs) image, e.g. np.memmap.
+#  @param num_bins       target number of histogram bins.
+#  @param alpha          low density clip.
+#  @param color_space    target color space. 'rgb', 'Lab', 'hsv', 'Luv', 'OKLab', 'OKLCh' (see core.color_space).
+#  @param tile_shape     (tile_h, tile_w) of the tiles.
+#  @param num_pixels     target number of pixels from the whole image. None for all pixels.
+#  @param sampling       pixel sampling method in each tile. 'stride' or 'random' or 'grid'.
+#  @param seed           random seed for 'random' and 'grid' sampling.
+#  @param color_range    'native' or [c_min, c_max]. Tiles are binned independently, so the range must be fixed.
+#  @param storage        histogram storage. 'dense' or 'sparse'.
+def tiledHist3D(image, num_bins=16, alpha=0.1, color_space='rgb',
+                tile_shape=(256, None), num_pixels=None, sampling='stride', seed=None,
+                color_range='native', storage='dense'):
+    hist3D = Hist3D(None, num_bins, alpha, color_space, num_pixels=num_pixels, sampling=sampling, seed=seed,
+                    color_range=color_range, storage=storage)
+    return updateTiled(hist3D, image, tile_shape, num_pixels, sampling, seed)
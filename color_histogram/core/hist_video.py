@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.core.hist_video
+#
+#  Streaming color histograms of video frames.
+#
+#  Each frame gets a Hist3D (and an optional Hist1D) with the native color range,
+#  so the frames are comparable bin-for-bin and are merged into a running aggregate histogram.
+#  Shot changes are detected from the histogram distance between consecutive frames.
+#  @author      tody
+#  @date        2026/10/18
+
+import numpy as np
+
+from color_histogram.core.color_pixels import ColorPixels
+from color_histogram.core.distance import histDistances
+from color_histogram.core.hist_1d import Hist1D
+from color_histogram.core.hist_3d import Hist3D
+from color_histogram.io_util.video import VideoFrames
+
+
+## Histograms of a single video frame.
+class FrameHistograms:
+    ## Constructor
+    #  @param frame_id     frame index in the video.
+    #  @param hist3D       Hist3D of the frame.
+    #  @param hist1D       Hist1D of the frame. None if disabled.
+    #  @param distance     histogram distance from the previous processed frame. None for the first frame.
+    #  @param shot_change  True if the distance exceeds the shot change threshold.
+    def __init__(self, frame_id, hist3D, hist1D=None, distance=None, shot_change=False):
+        self.frame_id = frame_id
+        self.hist3D = hist3D
+        self.hist1D = hist1D
+        self.distance = distance
+        self.shot_change = shot_change
+
+
+## Streaming color histograms of video frames with a running aggregate histogram.
+class VideoHistograms:
+    ## Constructor
+    #  @param num_bins          target number of histogram bins.
+    #  @param alpha             low density clip.
+    #  @param color_space       color space of Hist3D. See color_histogram.core.color_space.
+    #  @param hist1D_target     [color_space, channel] of Hist1D. None to disable Hist1D.
+    #  @param num_pixels        target number of pixels from each frame. None for all pixels.
+    #  @param sampling          pixel sampling method. 'stride' or 'random' or 'grid'.
+    #  @param seed              random seed for 'random' and 'grid' sampling.
+    #  @param distance_method   distance between consecutive Hist3D. See color_histogram.core.distance.
+    #  @param shot_threshold    distance threshold of the shot changes.
+    def __init__(self, num_bins=16, alpha=0.1, color_space='rgb', hist1D_target=None,
+                 num_pixels=1000, sampling='stride', seed=None,
+                 distance_method="bhattacharyya", shot_threshold=0.5):
+        self._num_bins = num_bins
+        self._alpha = alpha
+        self._color_space = color_space
+        self._hist1D_target = hist1D_target
+        self._num_pixels = num_pixels
+        self._sampling = sampling
+        self._seed = seed
+        self._distance_method = distance_method
+        self._shot_threshold = shot_threshold
+
+        self._aggregate = Hist3D(None, num_bins, alpha, color_space,
+                                 num_pixels=num_pixels, sampling=sampling, seed=seed, color_range='native')
+        self._num_frames = 0
+        self._shot_frames = []
+        self._prev_bins = None
+
+    ## Process the frames.
+    #  @param frames   iterable of (frame_id, RGB frame), e.g. VideoFrames.
+    #  @return         generator of FrameHistograms.
+    def process(self, frames):
+        for frame_id, frame in frames:
+            yield self.processFrame(frame_id, frame)
+
+    ## Process a single frame.
+    def processFrame(self, frame_id, frame):
+        color_pixels = ColorPixels(frame, self._num_pixels, self._sampling, self._seed)
+
+        hist3D = Hist3D(color_pixels, self._num_bins, self._alpha, self._color_space, color_range='native')
+
+        hist1D = None
+        if self._hist1D_target is not None:
+            color_space, channel = self._hist1D_target
+            hist1D = Hist1D(color_pixels, self._num_bins, self._alpha, color_space, channel, color_range='native')
+
+        hist_bins = np.ravel(hist3D.histBins())
+        distance = None
+        shot_change = False
+        if self._prev_bins is not None:
+            distance = float(histDistances(hist_bins, [self._prev_bins], self._distance_method,
+                                           hist_shape=(self._num_bins,) * 3)[0])
+            shot_change = distance > self._shot_threshold
+
+        if shot_change:
+            self._shot_frames.append(frame_id)
+
+        self._prev_bins = hist_bins
+        self._aggregate.merge(hist3D)
+        self._num_frames += 1
+        return FrameHistograms(frame_id, hist3D, hist1D, distance, shot_change)
+
+    ## Running aggregate Hist3D of the processed frames.
+    def aggregate(self):
+        return self._aggregate
+
+    def numFrames(self):
+        return self._num_frames
+
+    ## Frame IDs of the detected shot changes.
+    def shotFrames(self):
+        return list(self._shot_frames)
+
+
+## Streaming color histograms of the video file.
+#  @param file_path    video file path.
+#  @param frame_step   process every frame_step frames.
+#  @param scale        downscale factor of the frames.
+#  @param queue_size   maximum number of prefetched frames. 0 for reading on the calling thread.
+#  @param hist_params  parameters of VideoHistograms.
+#  @return             (VideoHistograms, generator of FrameHistograms).
+def videoHistograms(file_path, frame_step=1, scale=1.0, queue_size=8, **hist_params):
+    frames = VideoFrames(file_path, frame_step, scale, queue_size)
+    video_hists = VideoHistograms(**hist_params)
+    return video_hists, video_hists.process(frames)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.core.palette
+#
+#  Dominant color palettes from color histograms.
+#
+#  The occupied histogram bins are clustered by weighted k-means with the bin counts as weights,
+#  so the cost depends on the number of occupied bins, not on the number of pixels.
+#  Bins are clustered in the color space of the histogram (e.g. 'Lab' or 'OKLab' for perceptual palettes).
+#  Hue channels (e.g. 'hsv', 'OKLCh') are circular, and are clustered as (cos h, sin h) / 2
+#  so that the hues near 0 and 360 degrees fall in the same clusters.
+#  @author      tody
+#  @date        2026/10/18
+
+import numpy as np
+
+from color_histogram.core.color_space import colorSpace
+from color_histogram.np.kmeans import kmeans
+
+
+## Occupied bins of the histogram.
+#  @param hist   Hist1D, Hist2D or Hist3D (dense or sparse storage).
+#  @return       (k x d) normalized bin coordinates in [0, 1], (k) counts, (k x 3) mean RGB colors.
+def occupiedBins(hist):
+    color_ids = np.array(hist.colorIDs(), dtype=np.float32).T
+    bin_coordinates = color_ids / float(max(hist.numBins() - 1, 1))
+
+    hist_bins = hist.histBins()
+    color_bins = hist.colorBins()
+    if hist.binIDs() is None:
+        hist_positive = hist_bins > 0.0
+        hist_bins = hist_bins[hist_positive]
+        color_bins = color_bins[hist_positive]
+
+    return bin_coordinates, hist_bins, color_bins
+
+
+## Dominant colors of the histogram.
+#  @param hist            Hist1D, Hist2D or Hist3D (dense or sparse storage).
+#  @param num_colors      maximum number of palette colors.
+#  @param num_iterations  maximum number of k-means iterations.
+#  @param seed            random seed for k-means++ initialization. Same seed gives the same palette.
+#  @return                (k x 3) RGB colors, (k) weights (pixel ratios) sorted by the weights.
+def histPalette(hist, num_colors=5, num_iterations=20, seed=0):
+    bin_coordinates, hist_bins, color_bins = occupiedBins(hist)
+
+    if len(hist_bins) == 0:
+        return np.zeros((0, 3), dtype=np.float32), np.zeros(0, dtype=np.float32)
+
+    _, labels = kmeans(_circularHue(hist, bin_coordinates), num_colors, hist_bins, num_iterations, seed)
+    num_clusters = np.max(labels) + 1
+
+    cluster_weights = np.bincount(labels, weights=hist_bins, minlength=num_clusters)
+    colors = np.zeros((num_clusters, 3), dtype=np.float32)
+    for ci in xrange(3):
+        colors[:, ci] = np.bincount(labels, weights=hist_bins * color_bins[:, ci], minlength=num_clusters)
+
+    non_empty = cluster_weights > 0.0
+    colors = colors[non_empty] / cluster_weights[non_empty, None]
+    cluster_weights = cluster_weights[non_empty]
+
+    order = np.argsort(-cluster_weights, kind="mergesort")
+    weights = cluster_weights[order] / np.sum(cluster_weights)
+    return np.clip(colors[order], 0.0, 1.0), np.float32(weights)
+
+
+## Bin coordinates with the hue channel on the circle of diameter 1: (cos h, sin h) / 2.
+def _circularHue(hist, bin_coordinates):
+    header = hist.histHeader()
+    hue_channel = colorSpace(header.color_space).hueChannel()
+    if hue_channel not in header.channels:
+        return bin_coordinates
+
+    di = header.channels.index(hue_channel)
+    num_bins = hist.numBins()
+    c_min, c_max = header.color_range[0][di], header.color_range[1][di]
+
+    hue_ids = np.rint(bin_coordinates[:, di] * max(num_bins - 1, 1))
+    hues = np.radians(c_min + (hue_ids + 0.5) * (c_max - c_min) / num_bins)
+
+    hue_coordinates = 0.5 * np.float32(np.vstack((np.cos(hues), np.sin(hues))).T)
+    other_coordinates = np.delete(bin_coordinates, di, axis=1)
+    return np.hstack((other_coordinates, hue_coordinates))
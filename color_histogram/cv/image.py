@@ -21,29 +21,28 @@ def to8U(img):
 def to32F(img):
     if img.dtype == np.float32:
         return img
-    return (1.0 / 255.0) * np.float32(img)
+    img_32F = np.float32(img)
+    img_32F *= 1.0 / 255.0
+    return img_32F
 
 
 ## RGB channels of the image.
+#
+#  RGB images are returned as they are, and RGBA images as a view of the RGB channels.
+#  Gray images are expanded into 3 channels with a single vectorized copy.
 def rgb(img):
-
     if len(img.shape) == 2:
-        h, w = img.shape
-        img_rgb = np.zeros((h, w, 3), dtype=img.dtype)
-        for ci in range(3):
-            img_rgb[:, :, ci] = img
-        return img_rgb
+        return np.repeat(img[:, :, None], 3, axis=2)
 
     h, w, cs = img.shape
     if cs == 3:
         return img
 
-    img_rgb = np.zeros((h, w, 3), dtype=img.dtype)
-
-    cs = min(3, cs)
+    if cs > 3:
+        return img[:, :, :3]
 
-    for ci in range(cs):
-        img_rgb[:, :, ci] = img[:, :, ci]
+    img_rgb = np.zeros((h, w, 3), dtype=img.dtype)
+    img_rgb[:, :, :cs] = img
     return img_rgb
 
 
@@ -124,7 +123,7 @@ def rgb2bgr(img):
 
 ## RGB to Lab.
 def rgb2Lab(img):
-    img_rgb = rgb(img)
+    img_rgb = np.ascontiguousarray(rgb(img))
     Lab = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2LAB)
     return Lab
 
@@ -135,8 +134,9 @@ def Lab2rgb(img):
     return rgb
 
 
+## RGB to HSV.
 def rgb2hsv(img):
-    img_rgb = rgb(img)
+    img_rgb = np.ascontiguousarray(rgb(img))
     return cv2.cvtColor(img_rgb, cv2.COLOR_RGB2HSV)
 
 
@@ -148,33 +148,63 @@ def hsv2rgb(img):
 
 ## Merge channels.
 def merge(channels):
-    cs = 0
-    h = 0
-    w = 0
-    for channel in channels:
-        if len(channel.shape) == 2:
-            cs += 1
-        else:
-            cs += channel.shape[2]
-
-        h, w = channel.shape[0], channel.shape[1]
-
-    img = np.zeros((h, w, cs))
-
-    ci = 0
-    for channel in channels:
-        if len(channel.shape) == 2:
-            img[:, :, ci] = channel[:, :]
-            ci += 1
-            continue
-
-        for cci in range(channel.shape[2]):
-            img[:, :, ci] = channel[:, :, cci]
-            ci += 1
+    channels = [channel.reshape(channel.shape[:2] + (-1,)) for channel in channels]
+    h, w = channels[-1].shape[:2]
+    cs = sum(channel.shape[2] for channel in channels)
 
+    img = np.empty((h, w, cs))
+    np.concatenate(channels, axis=2, out=img)
     return img
 
 
+## RGB channels of (n x cs) pixels or (n) gray pixels.
+#
+#  RGBA pixels are returned as a view, and gray pixels as a read-only broadcast view.
+def rgbPixels(pixels):
+    if pixels.ndim == 1 or pixels.shape[1] == 1:
+        return np.broadcast_to(pixels.reshape(-1, 1), (pixels.shape[0], 3))
+    return pixels[:, :3]
+
+
+## Convert (n x 3) pixels with the cv2 color conversion code.
+#
+#  Pixels are converted as a (n x 1) image without the full image round-trip.
+#  @param pixels   (n x 3) pixels (uint8 or float32).
+#  @param code     cv2 color conversion code, e.g. cv2.COLOR_RGB2LAB.
+#  @param out      C-contiguous (n x 3) output buffer of the same type. None for a new array.
+def convertPixels(pixels, code, out=None):
+    num_pixels = pixels.shape[0]
+    if out is None:
+        out = np.empty((num_pixels, 3), dtype=pixels.dtype)
+    elif not out.flags.c_contiguous:
+        raise ValueError("Output buffer must be C-contiguous")
+    elif out.dtype != pixels.dtype or out.shape != (num_pixels, 3):
+        raise ValueError("Output buffer must be (%s x 3) %s, got %s %s" %
+                         (num_pixels, pixels.dtype, out.shape, out.dtype))
+
+    if num_pixels == 0:
+        return out
+
+    src = np.ascontiguousarray(pixels).reshape(num_pixels, 1, 3)
+    dst = out.reshape(num_pixels, 1, 3)
+    converted = cv2.cvtColor(src, code, dst=dst)
+
+    # cv2 allocates a new array if dst does not fit the result.
+    if converted is not dst and not np.shares_memory(converted, out):
+        out[:] = converted.reshape(num_pixels, 3)
+    return out
+
+
+## RGB to Lab for (n x 3) pixels.
+def rgb2LabPixels(pixels, out=None):
+    return convertPixels(pixels, cv2.COLOR_RGB2LAB, out)
+
+
+## RGB to HSV for (n x 3) pixels.
+def rgb2hsvPixels(pixels, out=None):
+    return convertPixels(pixels, cv2.COLOR_RGB2HSV, out)
+
+
 ## Luminance value from Lab.
 #  Lumiannce value will be in [0, 1]
 def luminance(img):
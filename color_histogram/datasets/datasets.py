@@ -2,15 +2,106 @@
 # # @package color_histogram.datasets.datasets
 #
 #  color_histogram.datasets.datasets utility package.
+#
+#  Data files are listed by a cached DatasetIndex for each data directory:
+#  the directory is scanned once, the file names are sorted in natural order (e.g. apple_2 before apple_10),
+#  and the index is rescanned only when the modification time of the directory changes.
 #  @author      tody
 #  @date        2016/06/08
 
 import os
+import re
+import time
+import fnmatch
+import threading
 
 from color_histogram.io_util.image import loadRGB
 
 _root_dir = os.path.dirname(__file__)
 
+# # Default file name patterns of the data files.
+_image_patterns = ["*.png", "*.jpg"]
+
+# # Modification time resolution of the file systems.
+#  Directories modified within this interval before the scan are rescanned on the next access,
+#  since later changes in the same interval may not change the modification time.
+_mtime_resolution = 2.0
+
+_indices = {}
+_indices_lock = threading.Lock()
+
+
+# # Cached index of the data files in a directory.
+class DatasetIndex:
+    # # Constructor
+    #  @param data_dir   data directory.
+    #  @param patterns   case-insensitive file name patterns (fnmatch). Hidden files are excluded.
+    def __init__(self, data_dir, patterns=_image_patterns):
+        self._data_dir = data_dir
+        self._patterns = [pattern.lower() for pattern in patterns]
+        self._lock = threading.Lock()
+        self._file_names = None
+        self._mtime = None
+        self._scan_time = None
+
+    def dataDir(self):
+        return self._data_dir
+
+    # # Sorted data file paths.
+    def files(self):
+        return [os.path.join(self._data_dir, file_name) for file_name in self._fileNames()]
+
+    # # Generator of the sorted data file paths.
+    def iterFiles(self):
+        for file_name in self._fileNames():
+            yield os.path.join(self._data_dir, file_name)
+
+    # # Data file path for the data_id. None if the data_id is out of range.
+    def file(self, data_id):
+        file_names = self._fileNames()
+        if data_id < 0 or data_id >= len(file_names):
+            return None
+        return os.path.join(self._data_dir, file_names[data_id])
+
+    def numFiles(self):
+        return len(self._fileNames())
+
+    # # Rescan the directory on the next access.
+    def invalidate(self):
+        with self._lock:
+            self._file_names = None
+
+    def _fileNames(self):
+        with self._lock:
+            mtime = _dirMTime(self._data_dir)
+            if self._file_names is None or not self._isValid(mtime):
+                self._scan_time = time.time()
+                self._file_names = self._scan()
+                self._mtime = mtime
+            return self._file_names
+
+    def _isValid(self, mtime):
+        if mtime != self._mtime:
+            return False
+        return mtime is None or self._scan_time - mtime >= _mtime_resolution
+
+    def _scan(self):
+        if not os.path.isdir(self._data_dir):
+            return []
+
+        file_names = [file_name for file_name in os.listdir(self._data_dir) if self._isTarget(file_name)]
+        return sorted(file_names, key=_naturalKey)
+
+    def _isTarget(self, file_name):
+        if file_name.startswith("."):
+            return False
+
+        file_name = file_name.lower()
+        for pattern in self._patterns:
+            if fnmatch.fnmatchcase(file_name, pattern):
+                return True
+        return False
+
 
 # # Data directory for the given data_name.
 def dataDir(data_name):
@@ -18,28 +109,36 @@ def dataDir(data_name):
     return data_dir
 
 
-# # Data file path list for the given data_name.
-def dataFiles(data_name):
-    data_dir = dataDir(data_name)
-    data_files = []
-    for data_name in os.listdir(data_dir):
-        data_file = os.path.join(data_dir, data_name)
-        if ".png" in data_name or ".jpg" in data_name:
-            data_files.append(data_file)
-        else:
-            os.remove(data_file)
-    return data_files
+# # Cached DatasetIndex for the given data_name and file name patterns.
+def datasetIndex(data_name, patterns=_image_patterns):
+    key = (data_name, tuple(patterns))
+    with _indices_lock:
+        index = _indices.get(key)
+        if index is None:
+            index = DatasetIndex(dataDir(data_name), patterns)
+            _indices[key] = index
+        return index
 
 
-# # Data file path for the given data_name and data_id.
-def dataFile(data_name, data_id):
-    data_files = dataFiles(data_name)
+# # Clear the cached dataset indices.
+def clearDatasetIndices():
+    with _indices_lock:
+        _indices.clear()
 
-    if data_id >= len(data_files):
-        return None
 
-    data_file = data_files[data_id]
-    return data_file
+# # Data file path list for the given data_name. Empty if the data directory does not exist.
+def dataFiles(data_name, patterns=_image_patterns):
+    return datasetIndex(data_name, patterns).files()
+
+
+# # Generator of the data file paths for the given data_name.
+def iterDataFiles(data_name, patterns=_image_patterns):
+    return datasetIndex(data_name, patterns).iterFiles()
+
+
+# # Data file path for the given data_name and data_id.
+def dataFile(data_name, data_id, patterns=_image_patterns):
+    return datasetIndex(data_name, patterns).file(data_id)
 
 
 def loadData(data_name, data_id):
@@ -49,3 +148,15 @@ def loadData(data_name, data_id):
         return None
 
     return loadRGB(data_file)
+
+
+def _dirMTime(data_dir):
+    try:
+        return os.stat(data_dir).st_mtime
+    except OSError:
+        return None
+
+
+def _naturalKey(file_name):
+    tokens = [int(token) if token.isdigit() else token.lower() for token in re.split(r"(\d+)", file_name)]
+    return tokens, file_name
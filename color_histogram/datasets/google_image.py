@@ -18,13 +18,10 @@
 import json
 import os
 import urllib2
-import httplib2
-
-import cv2
-import matplotlib.pyplot as plt
 
 from color_histogram.io_util.image import loadRGB, saveRGB
 from color_histogram.datasets.datasets import dataDir, dataFiles
+from color_histogram.datasets.ingest import ingestImages, datasetItems, resizeImage
 
 
 # # Simple image loaders via Google image API.
@@ -33,15 +30,16 @@ class GoogleImageLoader:
     #  @param keyword     keyword for image search.
     #  @param num_images  target number of images for the search.
     #  @param update      Update existing images if the value is True.
-    def __init__(self, keyword="banana", num_images=10, update=False):
+    #  @param num_workers  maximum number of concurrent downloads.
+    def __init__(self, keyword="banana", num_images=10, update=False, num_workers=8):
         self._keyword = keyword
         self._num_images = num_images
         self._data_dir = dataDir(keyword)
         self._update = update
+        self._num_workers = num_workers
 
         self.searchImageURLs()
         self.downloadImages()
-        self.postResize()
 
     def searchImageURLs(self):
         keyword = self._keyword
@@ -61,37 +59,14 @@ class GoogleImageLoader:
         self._image_urls = image_urls
         return image_urls
 
+    # # Download, resize and write the images with the resumable ingestion pipeline.
+    #  @return  IngestManifest with the done and failed images.
     def downloadImages(self):
         print "  Download"
-        data_name = self._keyword
-        image_urls = self._image_urls
-        data_dir = self._data_dir
-        if os.path.exists(data_dir) == False:
-            os.makedirs(data_dir)
-
-        http = httplib2.Http(".cache")
-
-        for i in range(len(set(image_urls))):
-            try:
-                url_name, ext = os.path.splitext(image_urls[i])
-
-                data_filename = "%s_%s%s" % (data_name, i, ext)
-                data_filepath = os.path.join(data_dir, data_filename)
-
-                if not self._update:
-                    if os.path.exists(data_filepath):
-                        print "  - Skip: %s" % data_filename
-                        continue
-
-                response, content = http.request(image_urls[i])
-
-                with open(data_filepath, 'wb') as data_file:
-                    data_file.write(content)
-
-                    print "  - Done: %s" % data_filename
-            except:
-                continue
+        items = datasetItems(self._keyword, self._image_urls)
+        return ingestImages(items, self._data_dir, num_download_workers=self._num_workers, update=self._update)
 
+    # # Resize the existing images in the data directory.
     def postResize(self):
         print "  Post resize"
         data_name = self._keyword
@@ -105,32 +80,25 @@ class GoogleImageLoader:
                 os.remove(data_file)
                 print "  - Delete: %s" % data_filename
                 continue
-            h, w = C_8U.shape[0:2]
-
-            opt_scale = 800.0 / float(h)
-            opt_scale = max(opt_scale, 800.0 / float(w))
-            opt_scale = min(opt_scale, 1.0)
-
-            h_opt = int(opt_scale * h)
-            w_opt = int(opt_scale * w)
 
-            C_8U_small = cv2.resize(C_8U, (w_opt, h_opt))
+            C_8U_small = resizeImage(C_8U, 800)
             saveRGB(data_file, C_8U_small)
             print "  - Resized: %s" % data_filename
 
 
 # # Create dataset for the given data_name.
-def createDataset(data_name="banana", num_images=10, update=False):
-    GoogleImageLoader(data_name, num_images, update)
+def createDataset(data_name="banana", num_images=10, update=False, num_workers=8):
+    GoogleImageLoader(data_name, num_images, update, num_workers)
 
 
 # # Create datasets for the given data_names.
 def createDatasets(data_names=["apple", "banana", "sky", "tulip", "flower"],
                    num_images=10,
-                   update=False):
+                   update=False,
+                   num_workers=8):
     for data_name in data_names:
         print "Create datasets: %s" % data_name
-        createDataset(data_name, num_images, update)
+        createDataset(data_name, num_images, update, num_workers)
 
 
 if __name__ == '__main__':
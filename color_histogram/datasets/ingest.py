@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+# # @package color_histogram.datasets.ingest
+#
+#  Parallel and resumable dataset ingestion.
+#
+#  Images are fetched by a bounded pool of download threads, and each downloaded image is
+#  decoded from memory, resized and written by a separate pool of processing threads
+#  while the other downloads are in flight.
+#  The status of each item is recorded in a manifest file,
+#  so an interrupted ingestion resumes with the items not completed yet.
+#
+#  Items are (item_name, url) pairs from any URL source (e.g. search results or a URL list),
+#  and the fetcher is pluggable (e.g. for a local HTTP server).
+#  @author      tody
+#  @date        2026/10/18
+
+import os
+import json
+import threading
+import traceback
+import urllib2
+from multiprocessing.pool import ThreadPool
+
+import cv2
+import numpy as np
+
+_image_exts = [".png", ".jpg"]
+
+
+# # Fetch the content of the URL.
+#  @param url       URL of the image.
+#  @param timeout   timeout in seconds.
+#  @return          content bytes.
+def fetchURL(url, timeout=30.0):
+    response = urllib2.urlopen(url, timeout=timeout)
+    try:
+        return response.read()
+    finally:
+        response.close()
+
+
+# # Ingestion items with the dataset naming: (data_name_i, url).
+def datasetItems(data_name, urls):
+    return [("%s_%s" % (data_name, i), url) for i, url in enumerate(urls)]
+
+
+# # Image file extension for the URL. Other formats are written as ".jpg".
+def imageExt(url):
+    ext = os.path.splitext(url.split("?")[0])[1].lower()
+    if ext == ".jpeg":
+        return ".jpg"
+    if ext in _image_exts:
+        return ext
+    return ".jpg"
+
+
+# # Resize the image so that the shorter side is at most target_size.
+def resizeImage(image, target_size=800):
+    h, w = image.shape[0:2]
+
+    opt_scale = target_size / float(h)
+    opt_scale = max(opt_scale, target_size / float(w))
+    opt_scale = min(opt_scale, 1.0)
+
+    if opt_scale == 1.0:
+        return image
+
+    h_opt = int(opt_scale * h)
+    w_opt = int(opt_scale * w)
+    return cv2.resize(image, (w_opt, h_opt), interpolation=cv2.INTER_AREA)
+
+
+# # Decode the image content, resize and write it to the file.
+#  @param content       encoded image bytes.
+#  @param file_path     output image file path.
+#  @param target_size   target size of the shorter side. None to keep the size.
+def processImage(content, file_path, target_size=800):
+    image = cv2.imdecode(np.frombuffer(content, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Image could not be decoded")
+
+    if target_size is not None:
+        image = resizeImage(image, target_size)
+
+    # Write to a hidden temporary file first, so an interrupted write does not leave a broken image.
+    data_dir, file_name = os.path.split(file_path)
+    tmp_file_path = os.path.join(data_dir, ".tmp_" + file_name)
+    if not cv2.imwrite(tmp_file_path, image):
+        raise IOError("Image could not be written: %s" % file_path)
+    os.rename(tmp_file_path, file_path)
+    return image.shape[:2]
+
+
+# # Manifest of the ingested items for resumption.
+#
+#  The manifest is a JSON file of item_name: {"url", "status", "file", "error", "attempts"}
+#  with the status 'done' or 'failed'. It is rewritten atomically on each update.
+class IngestManifest:
+    # # Constructor
+    #  @param file_path   manifest file path. The existing manifest is loaded.
+    def __init__(self, file_path):
+        self._file_path = file_path
+        self._lock = threading.Lock()
+        self._items = {}
+
+        if os.path.exists(file_path):
+            with open(file_path, "r") as f:
+                self._items = json.load(f)
+
+    def filePath(self):
+        return self._file_path
+
+    # # Item record. None for the items not ingested yet.
+    def item(self, item_name):
+        with self._lock:
+            record = self._items.get(item_name)
+            if record is None:
+                return None
+            return dict(record)
+
+    # # True if the item has to be ingested:
+    #  not ingested yet, failed less than max_attempts times, or done but the file is missing.
+    #  @param file_path   target file path of the item. Items without a record are not pending
+    #                     if the file already exists (e.g. datasets created before the manifest).
+    def isPending(self, item_name, max_attempts=3, file_path=None):
+        record = self.item(item_name)
+        if record is None:
+            return file_path is None or not os.path.exists(file_path)
+        if record["status"] == "done":
+            return not os.path.exists(record["file"])
+        return record["attempts"] < max_attempts
+
+    def markDone(self, item_name, url, file_path):
+        self._update(item_name, url, "done", file_path, None)
+
+    def markFailed(self, item_name, url, error):
+        self._update(item_name, url, "failed", None, error)
+
+    # # Item names with the given status.
+    def itemNames(self, status="done"):
+        with self._lock:
+            return sorted(item_name for item_name, record in self._items.items() if record["status"] == status)
+
+    def _update(self, item_name, url, status, file_path, error):
+        with self._lock:
+            record = self._items.get(item_name, {"attempts": 0})
+            self._items[item_name] = {"url": url,
+                                      "status": status,
+                                      "file": file_path,
+                                      "error": error,
+                                      "attempts": record["attempts"] + 1}
+            self._save()
+
+    def _save(self):
+        tmp_file_path = self._file_path + ".tmp"
+        with open(tmp_file_path, "w") as f:
+            json.dump(self._items, f, indent=2, sort_keys=True)
+        os.rename(tmp_file_path, self._file_path)
+
+
+# # Manifest file path of the data directory.
+#
+#  The manifest is placed next to the data directory, so the data directory contains the images only.
+def manifestFile(data_dir):
+    return os.path.normpath(data_dir) + ".manifest.json"
+
+
+# # Ingest the images: bounded concurrent downloads, then decode, resize and write on a worker pool.
+#
+#  Failures are recorded in the manifest with the error message, and do not stop the other items.
+#  @param items                  iterable of (item_name, url). See datasetItems.
+#  @param data_dir               output directory of the images.
+#  @param fetch_func             fetch_func(url) returns the content bytes. See fetchURL.
+#  @param num_download_workers   maximum number of concurrent downloads.
+#  @param num_process_workers    number of decode/resize/write threads. None for the number of cores.
+#  @param target_size            target size of the shorter side. None to keep the size.
+#  @param manifest_file          manifest file path. None for manifestFile(data_dir).
+#  @param max_attempts           maximum number of attempts of the failed items over the runs.
+#  @param max_pending            maximum number of images being downloaded or waiting for the processing,
+#                                which bounds the downloaded bytes in memory.
+#  @param update                 ingest the done items again if True.
+#  @param verbose                print the status of the items.
+#  @return                       IngestManifest.
+def ingestImages(items, data_dir, fetch_func=fetchURL,
+                 num_download_workers=8, num_process_workers=None, target_size=800,
+                 manifest_file=None, max_attempts=3, max_pending=16, update=False, verbose=True):
+    if not os.path.exists(data_dir):
+        os.makedirs(data_dir)
+
+    if manifest_file is None:
+        manifest_file = manifestFile(data_dir)
+    manifest = IngestManifest(manifest_file)
+
+    pending_items = []
+    for item_name, url in items:
+        file_path = os.path.join(data_dir, item_name + imageExt(url))
+        if update or manifest.isPending(item_name, max_attempts, file_path):
+            pending_items.append((item_name, url))
+            continue
+
+        if manifest.item(item_name) is None:
+            manifest.markDone(item_name, url, file_path)
+        if verbose:
+            print "  - Skip: %s" % item_name
+
+    if len(pending_items) == 0:
+        return manifest
+
+    # Slots are taken before the fetch and released after the processing.
+    def download(item):
+        item_name, url = item
+        pending_slots.acquire()
+        try:
+            return item_name, url, fetch_func(url), None
+        except Exception:
+            pending_slots.release()
+            return item_name, url, None, traceback.format_exc()
+
+    def process(item_name, url, content):
+        file_path = os.path.join(data_dir, item_name + imageExt(url))
+        try:
+            processImage(content, file_path, target_size)
+            manifest.markDone(item_name, url, file_path)
+            _printStatus(verbose, "Done", item_name)
+        except Exception:
+            manifest.markFailed(item_name, url, traceback.format_exc())
+            _printStatus(verbose, "Failed", item_name)
+        finally:
+            pending_slots.release()
+
+    pending_slots = threading.BoundedSemaphore(max_pending)
+    download_pool = ThreadPool(min(num_download_workers, len(pending_items)))
+    process_pool = ThreadPool(num_process_workers)
+    try:
+        for item_name, url, content, error in download_pool.imap_unordered(download, pending_items):
+            if error is not None:
+                manifest.markFailed(item_name, url, error)
+                _printStatus(verbose, "Failed", item_name)
+                continue
+
+            process_pool.apply_async(process, (item_name, url, content))
+
+        download_pool.close()
+        process_pool.close()
+        process_pool.join()
+    finally:
+        download_pool.terminate()
+        process_pool.terminate()
+    return manifest
+
+
+_print_lock = threading.Lock()
+
+
+def _printStatus(verbose, status, item_name):
+    if not verbose:
+        return
+
+    with _print_lock:
+        print "  - %s: %s" % (status, item_name)
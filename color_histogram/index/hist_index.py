@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.index.hist_index
+#
+#  Nearest neighbor index for color histogram retrieval.
+#
+#  Histograms are stored as normalized density vectors.
+#  For the search, the square root vectors (Hellinger embedding, L2 ~ Bhattacharyya distance)
+#  are reduced by PCA and partitioned into inverted lists by k-means (IVF).
+#  A query probes the nearest lists only, ranks the candidates in the reduced space,
+#  and re-ranks the best of them with the exact histogram distance.
+#  @author      tody
+#  @date        2026/10/18
+
+import json
+
+import numpy as np
+
+from color_histogram.core.distance import histVectors, normalizeHistograms, histDistances
+from color_histogram.np.kmeans import kmeans, squaredDistances
+
+
+## Nearest neighbor index of color histograms.
+#
+#  The index is held in memory: the normalized vectors for the exact re-ranking take
+#  N x D float32 (e.g. 400 MB for 25,000 16^3 histograms), plus N x num_components float32 reduced vectors.
+#  save() and load() read and write all of them with np.savez.
+#  For larger collections, scan a HistogramStore (np.memmap) with color_histogram.core.distance instead.
+class HistIndex:
+    ## Constructor
+    #  @param num_components   number of PCA components for the reduced vectors.
+    #  @param num_lists        number of inverted lists (k-means partitions).
+    #  @param num_probes       number of inverted lists probed by a query.
+    #  @param rerank_factor    number of candidates re-ranked exactly = rerank_factor * k.
+    #  @param method           exact distance for re-ranking. See color_histogram.core.distance.
+    #  @param seed             random seed for training.
+    def __init__(self, num_components=64, num_lists=64, num_probes=8, rerank_factor=20,
+                 method="bhattacharyya", seed=0):
+        self._num_components = num_components
+        self._num_lists = num_lists
+        self._num_probes = num_probes
+        self._rerank_factor = rerank_factor
+        self._method = method
+        self._seed = seed
+
+        self._keys = []
+        self._key_rows = {}
+        self._vectors = None
+        self._hist_shape = None
+
+        self._mean = None
+        self._components = None
+        self._centroids = None
+        self._reduced = None
+        self._list_ids = None
+
+        self._list_order = None
+        self._list_offsets = None
+
+    def __len__(self):
+        return len(self._keys)
+
+    def keys(self):
+        return list(self._keys)
+
+    ## True if the PCA and inverted lists are trained.
+    def isTrained(self):
+        return self._centroids is not None
+
+    ## Add histograms to the index.
+    #  @param keys     list of unique keys (e.g. image file names). JSON serializable for save().
+    #  @param hists    list of Hist1D, Hist2D, Hist3D or histogram counts with the same bin layout.
+    #                  Counts are (N x D) flat vectors of 1D histograms, or (N x dense bin shape) arrays.
+    def add(self, keys, hists):
+        keys = list(keys)
+        vectors = self._toVectors(hists)
+        hist_shape = _histShape(hists)
+
+        if len(keys) != vectors.shape[0]:
+            raise ValueError("Number of keys and histograms does not match")
+
+        for key in keys:
+            if key in self._key_rows:
+                raise KeyError("Duplicate key: %s" % key)
+
+        if self._vectors is not None and self._vectors.shape[1] != vectors.shape[1]:
+            raise ValueError("Histogram bin layout does not match the index")
+
+        if self._hist_shape is None:
+            self._hist_shape = hist_shape
+
+        num_rows = len(self._keys)
+        for ki, key in enumerate(keys):
+            self._key_rows[key] = num_rows + ki
+        self._keys.extend(keys)
+        self._vectors = _appendRows(self._vectors, vectors)
+
+        if self.isTrained():
+            reduced = self._reduce(vectors)
+            self._reduced = _appendRows(self._reduced, reduced)
+            self._list_ids = np.append(self._list_ids, self._assignLists(reduced))
+            self._list_order = None
+
+    ## Remove histograms from the index.
+    def remove(self, keys):
+        remove_rows = [self._key_rows[key] for key in keys]
+        keep = np.ones(len(self._keys), dtype=bool)
+        keep[remove_rows] = False
+
+        self._keys = [key for key, k in zip(self._keys, keep) if k]
+        self._key_rows = dict((key, row) for row, key in enumerate(self._keys))
+        self._vectors = self._vectors[keep]
+
+        if self.isTrained():
+            self._reduced = self._reduced[keep]
+            self._list_ids = self._list_ids[keep]
+            self._list_order = None
+
+    ## Train PCA and inverted lists from the current histograms.
+    #  @param max_samples  maximum number of histograms used for training.
+    def train(self, max_samples=10000):
+        num_rows = len(self._keys)
+        if num_rows == 0:
+            raise ValueError("No histograms to train the index")
+
+        random_state = np.random.RandomState(self._seed)
+        sample_rows = np.arange(num_rows)
+        if num_rows > max_samples:
+            sample_rows = np.sort(random_state.choice(num_rows, max_samples, replace=False))
+
+        embedded = _embed(self._vectors[sample_rows])
+        self._mean = np.mean(embedded, axis=0)
+        _, _, vt = np.linalg.svd(embedded - self._mean, full_matrices=False)
+        self._components = np.float32(vt[:self._num_components])
+
+        sample_reduced = self._reduce(self._vectors[sample_rows])
+        self._centroids, _ = kmeans(sample_reduced, self._num_lists, seed=self._seed)
+
+        self._reduced = self._reduce(self._vectors)
+        self._list_ids = self._assignLists(self._reduced)
+        self._list_order = None
+
+    ## Top-k most similar histograms.
+    #  @param hist     query Hist1D, Hist2D, Hist3D or histogram counts.
+    #  @param k        number of results.
+    #  @param exact    brute-force search over all histograms if True.
+    #  @return         list of (key, distance) sorted by the distance.
+    def query(self, hist, k=10, exact=False):
+        if len(self._keys) == 0:
+            return []
+
+        query = self._toVectors([hist])
+
+        if exact or not self.isTrained():
+            candidates = np.arange(len(self._keys))
+        else:
+            candidates = self._candidates(query, k)
+
+        if len(candidates) == 0:
+            return []
+
+        distances = histDistances(query[0], self._vectors[candidates], self._method, hist_shape=self._hist_shape)
+        order = np.argsort(distances, kind="mergesort")[:k]
+        return [(self._keys[candidates[i]], float(distances[i])) for i in order]
+
+    ## Save the index into a .npz file.
+    def save(self, file_path):
+        params = {
+            "num_components": self._num_components,
+            "num_lists": self._num_lists,
+            "num_probes": self._num_probes,
+            "rerank_factor": self._rerank_factor,
+            "method": self._method,
+            "seed": self._seed,
+        }
+        arrays = {
+            "params": np.array(json.dumps(params)),
+            "keys": np.array(json.dumps(self._keys)),
+            "vectors": _orEmpty(self._vectors),
+        }
+        if self._hist_shape is not None:
+            arrays.update(hist_shape=np.array(self._hist_shape, dtype=np.int64))
+        if self.isTrained():
+            arrays.update(mean=self._mean, components=self._components,
+                          centroids=self._centroids, list_ids=self._list_ids)
+        np.savez(file_path, **arrays)
+
+    ## Load the index saved by save().
+    @staticmethod
+    def load(file_path):
+        data = np.load(file_path)
+        params = json.loads(str(data["params"]))
+        hist_index = HistIndex(**dict((str(key), value) for key, value in params.items()))
+
+        keys = json.loads(str(data["keys"]))
+        hist_index._keys = keys
+        hist_index._key_rows = dict((key, row) for row, key in enumerate(keys))
+        hist_index._vectors = data["vectors"] if len(keys) > 0 else None
+        if "hist_shape" in data.files:
+            hist_index._hist_shape = tuple(int(size) for size in data["hist_shape"])
+
+        if "centroids" in data.files:
+            hist_index._mean = data["mean"]
+            hist_index._components = data["components"]
+            hist_index._centroids = data["centroids"]
+            hist_index._list_ids = data["list_ids"]
+            hist_index._reduced = hist_index._reduce(hist_index._vectors)
+        return hist_index
+
+    def _toVectors(self, hists):
+        if isinstance(hists, np.ndarray):
+            return normalizeHistograms(hists.reshape(hists.shape[0], -1))
+
+        if len(hists) > 0 and isinstance(hists[0], np.ndarray):
+            return normalizeHistograms([np.ravel(hist) for hist in hists])
+
+        return normalizeHistograms(histVectors(hists))
+
+    def _reduce(self, vectors):
+        return np.dot(_embed(vectors) - self._mean, self._components.T)
+
+    def _assignLists(self, reduced):
+        return np.int32(np.argmin(squaredDistances(reduced, self._centroids), axis=1))
+
+    ## Candidate rows from the nearest inverted lists, ranked in the reduced space.
+    def _candidates(self, query, k):
+        self._updateLists()
+
+        query_reduced = self._reduce(query)
+        num_probes = min(self._num_probes, self._centroids.shape[0])
+        probe_lists = np.argsort(squaredDistances(query_reduced, self._centroids)[0])[:num_probes]
+
+        candidates = np.concatenate([self._list_order[self._list_offsets[li]:self._list_offsets[li + 1]]
+                                     for li in probe_lists])
+
+        num_rerank = self._rerank_factor * k
+        if len(candidates) > num_rerank:
+            reduced_distances = squaredDistances(self._reduced[candidates], query_reduced)[:, 0]
+            best = np.argpartition(reduced_distances, num_rerank)[:num_rerank]
+            candidates = candidates[best]
+        return candidates
+
+    ## Rebuild the inverted lists (rows sorted by list ID) after add or remove.
+    def _updateLists(self):
+        if self._list_order is not None:
+            return
+
+        self._list_order = np.argsort(self._list_ids, kind="mergesort")
+        list_sizes = np.bincount(self._list_ids, minlength=self._centroids.shape[0])
+        self._list_offsets = np.concatenate(([0], np.cumsum(list_sizes)))
+
+
+## Dense bin shape of the histograms given to HistIndex.add.
+def _histShape(hists):
+    if isinstance(hists, np.ndarray):
+        return hists.shape[1:]
+
+    if len(hists) == 0:
+        return None
+
+    if isinstance(hists[0], np.ndarray):
+        return hists[0].shape
+    return hists[0].denseBins()[0].shape
+
+
+## Hellinger embedding of the normalized histograms.
+def _embed(vectors):
+    return np.sqrt(vectors)
+
+
+def _appendRows(rows, new_rows):
+    if rows is None:
+        return new_rows
+    return np.concatenate((rows, new_rows))
+
+
+def _orEmpty(rows):
+    if rows is None:
+        return np.zeros((0, 0), dtype=np.float32)
+    return rows
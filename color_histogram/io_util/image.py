@@ -5,7 +5,10 @@
 #  @author      tody
 #  @date        2015/07/18
 
+import os
+
 import cv2
+import numpy as np
 from color_histogram.cv.image import *
 
 
@@ -34,6 +37,20 @@ def loadAlpha(file_path):
     return alpha(bgra)
 
 
+## Memory-mapped image from .npy or raw pixel files without reading the pixels.
+#  @param file_path  .npy file, or raw file with the given shape.
+#  @param shape      (h, w) or (h, w, cs) of the raw file. Ignored for .npy files.
+#  @param dtype      pixel type of the raw file.
+#  @param offset     header size of the raw file in bytes.
+def loadImageMemmap(file_path, shape=None, dtype=np.uint8, offset=0):
+    if os.path.splitext(file_path)[1].lower() == ".npy":
+        return np.load(file_path, mmap_mode='r')
+
+    if shape is None:
+        raise ValueError("shape is required for raw image files")
+    return np.memmap(file_path, dtype=dtype, mode='r', offset=offset, shape=tuple(shape))
+
+
 def saveRGBA(file_path, img):
     bgra = rgba2bgra(img)
     cv2.imwrite(file_path, bgra)
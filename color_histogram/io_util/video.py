@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.io_util.video
+#
+#  Video frame reader utility package.
+#
+#  Frames are decoded by cv2.VideoCapture on a background thread
+#  and handed over through a bounded queue, so decoding overlaps with the histogram computation.
+#  @author      tody
+#  @date        2026/10/18
+
+import sys
+import threading
+import Queue
+
+import cv2
+
+from color_histogram.cv.image import bgr2rgb
+
+## Timeout for the queue operations to check the stop request [sec].
+_queue_timeout = 0.1
+
+_end_of_frames = object()
+
+
+## RGB frames of a video file.
+#
+#  Iteration yields (frame_id, uint8 RGB frame) for every frame_step frames.
+class VideoFrames:
+    ## Constructor
+    #  @param file_path    video file path (or any source supported by cv2.VideoCapture).
+    #  @param frame_step   read every frame_step frames. Skipped frames are grabbed without retrieving.
+    #  @param scale        downscale factor of the frames. 1.0 for the original size.
+    #  @param queue_size   maximum number of prefetched frames. 0 for reading on the calling thread.
+    def __init__(self, file_path, frame_step=1, scale=1.0, queue_size=8):
+        self._file_path = file_path
+        self._frame_step = max(1, int(frame_step))
+        self._scale = scale
+        self._queue_size = queue_size
+
+        capture = self._openCapture()
+        self._fps = capture.get(cv2.CAP_PROP_FPS)
+        self._num_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self._frame_size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                            int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        capture.release()
+
+    ## Frame rate of the video. 0 if unknown.
+    def fps(self):
+        return self._fps
+
+    ## Number of frames in the video reported by the container. 0 if unknown.
+    def numFrames(self):
+        return self._num_frames
+
+    ## (width, height) of the original frames.
+    def frameSize(self):
+        return self._frame_size
+
+    def frameStep(self):
+        return self._frame_step
+
+    def __iter__(self):
+        frames = readFrames(self._openCapture(), self._frame_step, self._scale)
+        if self._queue_size > 0:
+            frames = prefetch(frames, self._queue_size)
+        return frames
+
+    def _openCapture(self):
+        capture = cv2.VideoCapture(self._file_path)
+        if not capture.isOpened():
+            raise IOError("Cannot open video: %s" % self._file_path)
+        return capture
+
+
+## Read (frame_id, uint8 RGB frame) from the opened cv2.VideoCapture.
+#  @param frame_step   read every frame_step frames.
+#  @param scale        downscale factor of the frames.
+def readFrames(capture, frame_step=1, scale=1.0):
+    frame_id = 0
+    try:
+        while capture.grab():
+            if frame_id % frame_step == 0:
+                ret, bgr = capture.retrieve()
+                if not ret:
+                    break
+
+                if scale != 1.0:
+                    bgr = cv2.resize(bgr, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                yield frame_id, bgr2rgb(bgr)
+
+            frame_id += 1
+    finally:
+        capture.release()
+
+
+## Iterate the items on a background thread with a bounded queue.
+#
+#  Errors of the background thread are raised from the iteration.
+#  Closing the iteration early stops the background thread.
+#  @param items        iterable to be consumed on the background thread.
+#  @param queue_size   maximum number of prefetched items.
+def prefetch(items, queue_size=8):
+    queue = Queue.Queue(queue_size)
+    stop_event = threading.Event()
+
+    def put(item):
+        while not stop_event.is_set():
+            try:
+                queue.put(item, timeout=_queue_timeout)
+                return True
+            except Queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_end_of_frames)
+        except Exception:
+            put(_PrefetchError(sys.exc_info()))
+        finally:
+            if hasattr(items, "close"):
+                items.close()
+
+    thread = threading.Thread(target=produce)
+    thread.daemon = True
+    thread.start()
+
+    try:
+        while True:
+            item = queue.get()
+            if item is _end_of_frames:
+                break
+            if isinstance(item, _PrefetchError):
+                item.reraise()
+            yield item
+    finally:
+        stop_event.set()
+        thread.join()
+
+
+class _PrefetchError:
+    def __init__(self, exc_info):
+        self._exc_info = exc_info
+
+    def reraise(self):
+        exc_type, exc_value, exc_traceback = self._exc_info
+        raise exc_type, exc_value, exc_traceback
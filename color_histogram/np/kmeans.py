@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.np.kmeans
+#
+#  Weighted k-means clustering with deterministic seeding.
+#  @author      tody
+#  @date        2026/10/18
+
+import numpy as np
+
+
+## Weighted k-means clustering.
+#
+#  Centers are initialized by k-means++ with the given seed,
+#  so the same input always gives the same clusters.
+#  @param points          (n x d) points.
+#  @param num_clusters    target number of clusters. Clipped by the number of points.
+#  @param weights         (n) point weights. None for uniform weights.
+#  @param num_iterations  maximum number of Lloyd iterations.
+#  @param seed            random seed for k-means++ initialization.
+#  @return                (k x d) centers, (n) labels.
+def kmeans(points, num_clusters, weights=None, num_iterations=20, seed=0):
+    points = np.asarray(points, dtype=np.float32)
+    num_points = points.shape[0]
+
+    if weights is None:
+        weights = np.ones(num_points, dtype=np.float32)
+    weights = np.asarray(weights, dtype=np.float32)
+
+    num_clusters = min(num_clusters, num_points)
+    if num_clusters == 0:
+        return np.zeros((0, points.shape[1]), dtype=np.float32), np.zeros(0, dtype=np.int32)
+
+    centers = kmeansPlusPlus(points, num_clusters, weights, seed)
+    labels = nearestCenters(points, centers)
+
+    for i in xrange(num_iterations):
+        centers = _weightedMeans(points, labels, weights, centers)
+        new_labels = nearestCenters(points, centers)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    return centers, labels
+
+
+## k-means++ initial centers with weighted sampling.
+def kmeansPlusPlus(points, num_clusters, weights, seed=0):
+    random_state = np.random.RandomState(seed)
+    num_points = points.shape[0]
+
+    probs = weights / np.sum(weights) if np.sum(weights) > 0 else None
+    center_ids = [random_state.choice(num_points, p=probs)]
+    min_distances = squaredDistances(points, points[center_ids])[:, 0]
+
+    for ci in xrange(1, num_clusters):
+        scores = weights * min_distances
+        score_sum = np.sum(scores)
+        if score_sum <= 0.0:
+            break
+
+        center_id = random_state.choice(num_points, p=scores / score_sum)
+        center_ids.append(center_id)
+        min_distances = np.minimum(min_distances, squaredDistances(points, points[[center_id]])[:, 0])
+
+    return np.array(points[center_ids])
+
+
+## Labels of the nearest centers for the points.
+def nearestCenters(points, centers):
+    return np.int32(np.argmin(squaredDistances(points, centers), axis=1))
+
+
+## (n x k) squared Euclidean distances between points and centers.
+def squaredDistances(points, centers):
+    distances = np.einsum('ij,ij->i', points, points)[:, None] - 2.0 * np.dot(points, centers.T)
+    distances += np.einsum('ij,ij->i', centers, centers)[None, :]
+    return np.maximum(distances, 0.0)
+
+
+def _weightedMeans(points, labels, weights, centers):
+    num_clusters = centers.shape[0]
+    cluster_weights = np.bincount(labels, weights=weights, minlength=num_clusters)
+
+    new_centers = np.array(centers)
+    for di in xrange(points.shape[1]):
+        sums = np.bincount(labels, weights=weights * points[:, di], minlength=num_clusters)
+        non_empty = cluster_weights > 0.0
+        new_centers[non_empty, di] = sums[non_empty] / cluster_weights[non_empty]
+    return new_centers
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.plot.canvas
+#
+#  Headless figure rendering with the Agg canvas.
+#
+#  Figures are created without pyplot, so they are not registered in the pyplot global state
+#  and are released as soon as they are unreferenced.
+#  Template figures are reused across the results of the same kind: the axes are kept and cleared,
+#  so a batch over many images allocates a single figure per result kind.
+#  @author      tody
+#  @date        2026/10/18
+
+_template_figures = {}
+
+
+## New figure with the non-interactive Agg canvas.
+def aggFigure(figsize=(10, 6)):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+## Template figure for the name with cleared axes.
+#  @param name        template name (e.g. result kind).
+#  @param figsize     figure size of a new figure.
+#  @param setup_func  setup_func(fig) to create the axes and the fixed decorations of a new figure.
+def templateFigure(name, figsize, setup_func):
+    fig = _template_figures.get(name)
+    if fig is None:
+        fig = aggFigure(figsize)
+        setup_func(fig)
+        _template_figures[name] = fig
+        return fig
+
+    for ax in fig.axes:
+        ax.cla()
+    return fig
+
+
+## Release the template figures.
+def releaseTemplateFigures():
+    for fig in _template_figures.values():
+        fig.clf()
+    _template_figures.clear()
@@ -10,11 +10,22 @@ import numpy as np
 
 
 # #  Convert matplot figure to numpy.array
-def figure2numpy(fig, call_draw=True):
+#
+#  The RGB image is a zero-copy view of the Agg canvas buffer (buffer_rgba),
+#  which is overwritten by the next draw of the figure. Use copy=True to keep it.
+#  @param fig        figure with the Agg canvas.
+#  @param call_draw  draw the figure before the conversion.
+#  @param copy       return a contiguous copy instead of the view.
+def figure2numpy(fig, call_draw=True, copy=False):
     if call_draw:
         fig.canvas.draw()
 
-    fig_data = np.fromstring(fig.canvas.tostring_rgb(), dtype=np.uint8, sep='')
-    image = fig_data.reshape(fig.canvas.get_width_height()[::-1] + (3,))
+    renderer = fig.canvas.get_renderer()
+    h, w = int(renderer.height), int(renderer.width)
+
+    fig_data = np.frombuffer(fig.canvas.buffer_rgba(), dtype=np.uint8)
+    image = fig_data.reshape(h, w, 4)[:, :, :3]
 
+    if copy:
+        return np.array(image)
     return image
@@ -6,27 +6,30 @@
 #  @date        2015/08/28
 
 import os
+import functools
 import numpy as np
-import matplotlib.pyplot as plt
 
 from color_histogram.io_util.image import loadRGB
 from color_histogram.cv.image import rgb, to32F
 
+from color_histogram.core.color_pixels import ColorPixels
 from color_histogram.datasets.datasets import dataFile
 from color_histogram.results.results import resultFile, batchResults
-from color_histogram.plot.window import showMaximize
+from color_histogram.plot.canvas import templateFigure
 from color_histogram.util.timer import timing_func
 from color_histogram.core.hist_1d import Hist1D
+from color_histogram.core.color_space import colorSpace
 
 
-# # Plot 1D color histograms for the target image, color space, channels.
+_font_size = 15
+
+
+# # Plot 1D color histograms for the target image (or shared ColorPixels), color space, channels.
 @timing_func
 def plotHistogram1D(image, num_bins, color_space, channel, ax):
-    font_size = 15
-
-    plt.title("%s (%s): %s bins" % (color_space,
-                                        color_space[channel],
-                                        num_bins), fontsize=font_size)
+    ax.set_title("%s (%s): %s bins" % (color_space,
+                                       colorSpace(color_space).label(channel),
+                                       num_bins), fontsize=_font_size)
 
     hist1D = Hist1D(image, num_bins=num_bins, color_space=color_space, channel=channel)
     hist1D.plot(ax)
@@ -34,9 +37,17 @@ def plotHistogram1D(image, num_bins, color_space, channel, ax):
 
 # # Create histogram 1D result function.
 def histogram1DResultFunc(num_bins=32):
-    def func(image_file):
-        histogram1DResult(image_file, num_bins)
-    return func
+    return functools.partial(histogram1DResult, num_bins=num_bins)
+
+
+# # Create the figure template of histogram 1D results.
+def _setupFigure1D(fig):
+    fig.subplots_adjust(left=0.1, bottom=0.1, right=0.9, top=0.95, wspace=0.3, hspace=0.2)
+    fig.suptitle("Hisotogram 1D", fontsize=_font_size)
+
+    fig.add_subplot(231)
+    for plot_id in [234, 235, 236]:
+        fig.add_subplot(plot_id)
 
 
 # # Compute histogram 1D result for the image file.
@@ -50,39 +61,34 @@ def histogram1DResult(image_file, num_bins=32, image=None, tile=None):
     if tile is None:
         tile = image
 
-    fig_w = 10
-    fig_h = 6
-    fig = plt.figure(figsize=(fig_w, fig_h))
-    fig.subplots_adjust(left=0.1, bottom=0.1, right=0.9, top=0.95, wspace=0.3, hspace=0.2)
-
-    font_size = 15
-    fig.suptitle("Hisotogram 1D", fontsize=font_size)
+    fig = templateFigure("hist1D", (10, 6), _setupFigure1D)
+    image_ax, hist_axes = fig.axes[0], fig.axes[1:]
 
     h, w = image.shape[:2]
-    fig.add_subplot(231)
-    plt.title("Original Image: %s x %s" % (w, h), fontsize=font_size)
-    plt.imshow(tile)
-    plt.axis('off')
+    image_ax.set_title("Original Image: %s x %s" % (w, h), fontsize=_font_size)
+    image_ax.imshow(tile)
+    image_ax.axis('off')
 
     color_targets = [["Lab", 0], ["hsv", 0], ["hsv", 2]]
 
-    plot_id = 234
-    for color_target in color_targets:
-        ax = fig.add_subplot(plot_id)
+    color_pixels = ColorPixels(image)
+
+    for ax, color_target in zip(hist_axes, color_targets):
         color_space, channel = color_target
-        plotHistogram1D(image, num_bins, color_space, channel, ax)
-        plot_id += 1
+        plotHistogram1D(color_pixels, num_bins, color_space, channel, ax)
 
     result_name = image_name + "_hist1D"
     result_file = resultFile(result_name)
-    plt.savefig(result_file, transparent=True)
+    fig.savefig(result_file, transparent=True)
 
 
 
 
 # # Compute histogram 1D results for the given data names, ids.
-def histogram1DResults(data_names, data_ids, num_bins=16):
-    batchResults(data_names, data_ids, histogram1DResultFunc(num_bins), "Histogram 1D")
+def histogram1DResults(data_names, data_ids, num_bins=16,
+                       num_workers=1, chunk_size=1, ordered=True):
+    return batchResults(data_names, data_ids, histogram1DResultFunc(num_bins), "Histogram 1D",
+                        num_workers, chunk_size, ordered)
 
 
 if __name__ == '__main__':
@@ -7,28 +7,32 @@
 #  @date        2015/08/28
 
 import os
+import functools
 import numpy as np
-import matplotlib.pyplot as plt
 
 from color_histogram.io_util.image import loadRGB
 from color_histogram.cv.image import rgb, to32F
 
+from color_histogram.core.color_pixels import ColorPixels
 from color_histogram.datasets.datasets import dataFile
 from color_histogram.results.results import resultFile, batchResults
-from color_histogram.plot.window import showMaximize
+from color_histogram.plot.canvas import templateFigure
 from color_histogram.core.hist_2d import Hist2D
+from color_histogram.core.color_space import colorSpace
 from color_histogram.util.timer import timing_func
 
 
-# # Plot 2D color histograms for the target image, color space, channels.
+_font_size = 15
+
+
+# # Plot 2D color histograms for the target image (or shared ColorPixels), color space, channels.
 @timing_func
 def plotHistogram2D(image, num_bins, color_space, channels, ax):
-    font_size = 15
-
-    plt.title("%s (%s, %s): %s bins" % (color_space,
-                                        color_space[channels[0]],
-                                        color_space[channels[1]],
-                                        num_bins), fontsize=font_size)
+    labels = colorSpace(color_space).labels()
+    ax.set_title("%s (%s, %s): %s bins" % (color_space,
+                                           labels[channels[0]],
+                                           labels[channels[1]],
+                                           num_bins), fontsize=_font_size)
 
     hist2D = Hist2D(image, num_bins=num_bins, color_space=color_space, channels=channels)
     hist2D.plot(ax)
@@ -36,9 +40,17 @@ def plotHistogram2D(image, num_bins, color_space, channels, ax):
 
 # # Create histogram 2D result function.
 def histogram2DResultFunc(num_bins=32):
-    def func(image_file):
-        histogram2DResult(image_file, num_bins)
-    return func
+    return functools.partial(histogram2DResult, num_bins=num_bins)
+
+
+# # Create the figure template of histogram 2D results.
+def _setupFigure2D(fig):
+    fig.subplots_adjust(left=0.1, bottom=0.1, right=0.9, top=0.95, wspace=0.3, hspace=0.2)
+    fig.suptitle("Hisotogram 2D", fontsize=_font_size)
+
+    fig.add_subplot(231)
+    for plot_id in [234, 235, 236]:
+        fig.add_subplot(plot_id)
 
 
 # # Compute histogram 2D result for the image file.
@@ -52,37 +64,32 @@ def histogram2DResult(image_file, num_bins=32, image=None, tile=None):
     if tile is None:
         tile = image
 
-    fig_w = 10
-    fig_h = 6
-    fig = plt.figure(figsize=(fig_w, fig_h))
-    fig.subplots_adjust(left=0.1, bottom=0.1, right=0.9, top=0.95, wspace=0.3, hspace=0.2)
-
-    font_size = 15
-    fig.suptitle("Hisotogram 2D", fontsize=font_size)
+    fig = templateFigure("hist2D", (10, 6), _setupFigure2D)
+    image_ax, hist_axes = fig.axes[0], fig.axes[1:]
 
     h, w = image.shape[:2]
-    fig.add_subplot(231)
-    plt.title("Original Image: %s x %s" % (w, h), fontsize=font_size)
-    plt.imshow(tile)
-    plt.axis('off')
+    image_ax.set_title("Original Image: %s x %s" % (w, h), fontsize=_font_size)
+    image_ax.imshow(tile)
+    image_ax.axis('off')
 
     color_space = "hsv"
     channels_list = [[0, 1], [0, 2], [1, 2]]
 
-    plot_id = 234
-    for channels in channels_list:
-        ax = fig.add_subplot(plot_id)
-        plotHistogram2D(image, num_bins, color_space, channels, ax)
-        plot_id += 1
+    color_pixels = ColorPixels(image)
+
+    for ax, channels in zip(hist_axes, channels_list):
+        plotHistogram2D(color_pixels, num_bins, color_space, channels, ax)
 
     result_name = image_name + "_hist2D"
     result_file = resultFile(result_name)
-    plt.savefig(result_file, transparent=True)
+    fig.savefig(result_file, transparent=True)
 
 
 # # Compute histogram 2D results for the given data names, ids.
-def histogram2DResults(data_names, data_ids, num_bins=32):
-    batchResults(data_names, data_ids, histogram2DResultFunc(num_bins), "Histogram 2D")
+def histogram2DResults(data_names, data_ids, num_bins=32,
+                       num_workers=1, chunk_size=1, ordered=True):
+    return batchResults(data_names, data_ids, histogram2DResultFunc(num_bins), "Histogram 2D",
+                        num_workers, chunk_size, ordered)
 
 if __name__ == '__main__':
     data_names = ["flower"]
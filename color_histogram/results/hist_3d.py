@@ -6,24 +6,26 @@
 #  @date        2015/08/28
 
 import os
+import functools
 import numpy as np
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
 
 from color_histogram.io_util.image import loadRGB
 from color_histogram.cv.image import rgb, to32F, rgb2Lab, rgb2hsv
 from color_histogram.core.hist_3d import Hist3D
+from color_histogram.core.color_pixels import ColorPixels
 from color_histogram.datasets.datasets import dataFile
 from color_histogram.results.results import resultFile, batchResults
-from color_histogram.plot.window import showMaximize
+from color_histogram.plot.canvas import templateFigure
 from color_histogram.util.timer import timing_func
 
 
-# # Plot 3D color histograms for the target image, color space, channels.
+_font_size = 15
+
+
+# # Plot 3D color histograms for the target image (or shared ColorPixels), color space, channels.
 @timing_func
 def plotHistogram3D(image, num_bins, color_space, ax):
-    font_size = 15
-    plt.title("%s: %s bins" % (color_space, num_bins), fontsize=font_size)
+    ax.set_title("%s: %s bins" % (color_space, num_bins), fontsize=_font_size)
 
     hist3D = Hist3D(image, num_bins=num_bins, color_space=color_space)
     hist3D.plot(ax)
@@ -31,9 +33,20 @@ def plotHistogram3D(image, num_bins, color_space, ax):
 
 # # Create histogram 3D result function.
 def histogram3DResultFunc(num_bins=32):
-    def func(image_file):
-        histogram3DResult(image_file, num_bins)
-    return func
+    return functools.partial(histogram3DResult, num_bins=num_bins)
+
+
+# # Create the figure template of histogram 3D results.
+def _setupFigure3D(fig):
+    # Register the '3d' projection only when the figure is created.
+    from mpl_toolkits.mplot3d import Axes3D
+
+    fig.subplots_adjust(left=0.05, bottom=0.05, right=0.95, top=0.95, wspace=0.02, hspace=0.2)
+    fig.suptitle("Hisotogram 3D", fontsize=_font_size)
+
+    fig.add_subplot(231)
+    for plot_id in [234, 235, 236]:
+        fig.add_subplot(plot_id, projection='3d')
 
 
 # # Compute histogram 3D result for the image file.
@@ -47,36 +60,31 @@ def histogram3DResult(image_file, num_bins=32, image=None, tile=None):
     if tile is None:
         tile = image
 
-    fig_w = 10
-    fig_h = 6
-    fig = plt.figure(figsize=(fig_w, fig_h))
-    fig.subplots_adjust(left=0.05, bottom=0.05, right=0.95, top=0.95, wspace=0.02, hspace=0.2)
-
-    font_size = 15
-    fig.suptitle("Hisotogram 3D", fontsize=font_size)
+    fig = templateFigure("hist3D", (10, 6), _setupFigure3D)
+    image_ax, hist_axes = fig.axes[0], fig.axes[1:]
 
     h, w = image.shape[:2]
-    fig.add_subplot(231)
-    plt.title("Original Image: %s x %s" % (w, h), fontsize=font_size)
-    plt.imshow(tile)
-    plt.axis('off')
+    image_ax.set_title("Original Image: %s x %s" % (w, h), fontsize=_font_size)
+    image_ax.imshow(tile)
+    image_ax.axis('off')
 
     color_spaces = ["rgb", "Lab", "hsv"]
 
-    plot_id = 234
-    for color_space in color_spaces:
-        ax = fig.add_subplot(plot_id, projection='3d')
-        plotHistogram3D(image, num_bins, color_space, ax)
-        plot_id += 1
+    color_pixels = ColorPixels(image)
+
+    for ax, color_space in zip(hist_axes, color_spaces):
+        plotHistogram3D(color_pixels, num_bins, color_space, ax)
 
     result_name = image_name + "_hist3D"
     result_file = resultFile(result_name)
-    plt.savefig(result_file, transparent=True)
+    fig.savefig(result_file, transparent=True)
 
 
 # # Compute histogram 3D results for the data names, ids.
-def histogram3DResults(data_names, data_ids, num_bins=32):
-    batchResults(data_names, data_ids, histogram3DResultFunc(num_bins), "Histogram 3D")
+def histogram3DResults(data_names, data_ids, num_bins=32,
+                       num_workers=1, chunk_size=1, ordered=True):
+    return batchResults(data_names, data_ids, histogram3DResultFunc(num_bins), "Histogram 3D",
+                        num_workers, chunk_size, ordered)
 
 if __name__ == '__main__':
     data_names = ["flower"]
@@ -6,7 +6,13 @@
 #  @date        2015/08/20
 
 import os
+import functools
+import multiprocessing
+import traceback
+
 from color_histogram.datasets.datasets import dataFile
+from color_histogram.plot.canvas import releaseTemplateFigures
+from color_histogram.util import instrument
 
 _root_dir = os.path.dirname(__file__)
 
@@ -22,24 +28,115 @@ def resultFile(image_name, image_ext=".png"):
     return result_file
 
 
-def batchResults(data_names, data_ids, batch_func, batch_name):
-    for data_name in data_names:
-        print "%s: %s" % (batch_name, data_name)
-        for data_id in data_ids:
-            print "Data ID: %s" % data_id
-            image_file = dataFile(data_name, data_id)
-            batch_func(image_file)
+# # Batch command for the target data files.
+#
+#  The batch and its jobs are instrumented as spans (see color_histogram.util.instrument).
+#  Worker processes have their own copies of the sinks registered before the batch.
+#  @param batch_func   batch_func(image_file) for a data file.
+#                      Must be picklable (module level function or functools.partial) for num_workers != 1.
+#  @param batch_name   batch command name.
+#  @param num_workers  number of worker processes. 1 runs in the current process, None uses all cores.
+#  @param chunk_size   number of jobs sent to a worker process at once.
+#  @param ordered      report results in the job order if True, as completed otherwise.
+#  @return             list of (job, result, error) for the (data_name, data_id) jobs.
+def batchResults(data_names, data_ids, batch_func, batch_name,
+                 num_workers=1, chunk_size=1, ordered=True):
+    jobs = [(data_name, data_id) for data_name in data_names for data_id in data_ids]
+    job_func = functools.partial(_dataFileJob, batch_func)
+
+    print "%s: %s" % (batch_name, ", ".join(data_names))
+    results = []
+    with instrument.span(batch_name, num_workers=num_workers) as span:
+        for job, result, error in runJobs(job_func, jobs, num_workers, chunk_size, ordered):
+            _printJobStatus("Data %s %s" % job, error)
+            _countJob(span, error)
+            results.append((job, result, error))
+        releaseTemplateFigures()
+    return results
 
 
 # # Batch command for the target data group.
 #
 #  @param batch_func batch_func(data_name, data_ids) for a data group.
 #  @param batch_name batch command name.
-def batchDataGroup(data_names, data_ids, batch_func, batch_name):
-    for data_name in data_names:
-        print "%s: %s" % (batch_name, data_name)
+#  @param num_workers  number of worker processes. 1 runs in the current process, None uses all cores.
+#  @param chunk_size   number of jobs sent to a worker process at once.
+#  @param ordered      report results in the job order if True, as completed otherwise.
+#  @return             list of (job, result, error) for the (data_name, data_ids) jobs.
+def batchDataGroup(data_names, data_ids, batch_func, batch_name,
+                   num_workers=1, chunk_size=1, ordered=True):
+    jobs = [(data_name, data_ids) for data_name in data_names]
+
+    print "%s: %s" % (batch_name, ", ".join(data_names))
+    results = []
+    with instrument.span(batch_name, num_workers=num_workers) as span:
+        for job, result, error in runJobs(batch_func, jobs, num_workers, chunk_size, ordered):
+            _printJobStatus("Data group %s" % job[0], error)
+            _countJob(span, error)
+            results.append((job, result, error))
+        releaseTemplateFigures()
+    return results
+
+
+# # Run batch_func(*job) for the jobs with an optional process pool.
+#
+#  A failure of a job is reported in its error, and does not stop the other jobs.
+#  @param batch_func   batch_func(*job) for a job.
+#  @param jobs         list of job argument tuples.
+#  @param num_workers  number of worker processes. 1 runs in the current process, None uses all cores.
+#  @param chunk_size   number of jobs sent to a worker process at once.
+#  @param ordered      yield results in the job order if True, as completed otherwise.
+#  @return             generator of (job, result, error). error is a traceback string or None.
+def runJobs(batch_func, jobs, num_workers=1, chunk_size=1, ordered=True):
+    tasks = [(batch_func, job) for job in jobs]
+
+    if num_workers == 1:
+        for task in tasks:
+            yield _runJob(task)
+        return
+
+    pool = multiprocessing.Pool(num_workers)
+    try:
+        if ordered:
+            job_results = pool.imap(_runJob, tasks, chunk_size)
+        else:
+            job_results = pool.imap_unordered(_runJob, tasks, chunk_size)
+
+        for job_result in job_results:
+            yield job_result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _runJob(task):
+    batch_func, job = task
+    with instrument.span("job", job=repr(job)):
+        try:
+            return job, batch_func(*job), None
+        except Exception:
+            return job, None, traceback.format_exc()
+
+
+def _countJob(span, error):
+    span.count("jobs")
+    if error is not None:
+        span.count("failed_jobs")
+
+
+def _dataFileJob(batch_func, data_name, data_id):
+    image_file = dataFile(data_name, data_id)
+    return batch_func(image_file)
+
+
+def _printJobStatus(job_name, error):
+    if error is None:
+        print "  - Done: %s" % job_name
+        return
 
-        batch_func(data_name, data_ids)
+    print "  - Failed: %s" % job_name
+    print error
 
 if __name__ == '__main__':
     print resultDir()
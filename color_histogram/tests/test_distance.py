@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.tests.test_distance
+#
+#  Identity and symmetry of the histogram distances, and the bin shapes of the EMD distances.
+#  @author      tody
+#  @date        2026/10/18
+
+import unittest
+
+import numpy as np
+
+from color_histogram.core.distance import distanceMethods, histDistances, emdDistances, histVectors
+from color_histogram.core.hist_1d import Hist1D
+from color_histogram.core.hist_3d import Hist3D
+
+
+def _hists(num_hists=20, hist_shape=(8, 8, 8), seed=0):
+    random_state = np.random.RandomState(seed)
+    hists = random_state.rand(num_hists, *hist_shape).astype(np.float32)
+    hists[hists < 0.5] = 0.0
+    return hists
+
+
+class DistanceTest(unittest.TestCase):
+    def test_identity(self):
+        hists = _hists()
+        for method in distanceMethods():
+            for hist in hists:
+                distance = histDistances(hist, hist[None], method, hist_shape=hist.shape)[0]
+                self.assertAlmostEqual(distance, 0.0, places=5, msg=method)
+
+    def test_symmetry(self):
+        hists = _hists()
+        for method in distanceMethods():
+            distances = np.array([histDistances(hist, hists, method, hist_shape=hist.shape) for hist in hists])
+            np.testing.assert_allclose(distances, distances.T, atol=1e-5, err_msg=method)
+            self.assertTrue(np.all(distances >= 0.0), msg=method)
+
+    def test_bhattacharyya_identity(self):
+        hists = _hists(50, (16, 16, 16))
+        for hist in hists:
+            self.assertLess(histDistances(hist, hist[None], "bhattacharyya")[0], 1e-6)
+
+    def test_emd_shape(self):
+        hists = _hists()
+        flat_hists = hists.reshape(len(hists), -1)
+
+        # Dense bin shape of the query, or the explicit bin shape for the flat vectors.
+        distances = emdDistances(hists[0], hists)
+        np.testing.assert_allclose(emdDistances(flat_hists[0], flat_hists, hist_shape=(8, 8, 8)), distances)
+
+        # Flat vectors without the bin shape are 1D histograms.
+        self.assertFalse(np.allclose(emdDistances(flat_hists[0], flat_hists), distances))
+
+        with self.assertRaises(ValueError):
+            emdDistances(flat_hists[0], flat_hists, hist_shape=(8, 8))
+
+    def test_emd_1d(self):
+        # Unit mass moved by 3 bins.
+        query = np.zeros(8)
+        query[1] = 1.0
+        hist = np.zeros(8)
+        hist[4] = 1.0
+        self.assertAlmostEqual(emdDistances(query, hist[None])[0], 3.0)
+
+    def test_emd_hist(self):
+        image = np.random.RandomState(0).randint(0, 256, size=(32, 48, 3)).astype(np.uint8)
+        hist3Ds = [Hist3D(image, 8, color_range='native'), Hist3D(image[::-1, :, ::-1], 8, color_range='native')]
+        distances = histDistances(hist3Ds[0].histBins(), histVectors(hist3Ds), "emd")
+        self.assertAlmostEqual(distances[0], 0.0, places=5)
+        self.assertGreater(distances[1], 0.0)
+
+        hist1Ds = [Hist1D(image, 8, color_range='native'), Hist1D(image[:, :, ::-1], 8, color_range='native')]
+        distances = histDistances(hist1Ds[0].histBins(), histVectors(hist1Ds), "emd")
+        self.assertAlmostEqual(distances[0], 0.0, places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
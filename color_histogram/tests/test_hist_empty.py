@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.tests.test_hist_empty
+#
+#  Empty histograms with a fixed color range (accumulators for update(), merge() and load()).
+#  @author      tody
+#  @date        2026/10/18
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from color_histogram.core.hist_1d import Hist1D
+from color_histogram.core.hist_2d import Hist2D
+from color_histogram.core.hist_3d import Hist3D
+from color_histogram.core.hist_io import HistogramStore, createHistogramStore
+from color_histogram.core.hist_tiled import tiledHist3D
+from color_histogram.util import instrument
+
+
+def _image(seed=0):
+    return np.random.RandomState(seed).randint(0, 256, size=(32, 48, 3)).astype(np.uint8)
+
+
+class EmptyHistTest(unittest.TestCase):
+    def _checkEmpty(self, hist):
+        self.assertEqual(np.sum(hist.histSums()[1]), 0)
+
+    def test_empty(self):
+        self._checkEmpty(Hist1D(None, 16, color_range='native'))
+        self._checkEmpty(Hist2D(None, 16, color_range='native'))
+        self._checkEmpty(Hist3D(None, 16, color_range='native'))
+        self._checkEmpty(Hist3D(None, 16, color_range='native', storage='sparse'))
+
+    def test_empty_instrumented(self):
+        sink = instrument.addSink(instrument.AggregateSink())
+        try:
+            self._checkEmpty(Hist3D(None, 16, color_range='native'))
+            self.assertEqual(sink.summary()["hist3D.sums"]["counters"]["pixels_binned"], 0)
+        finally:
+            instrument.removeSink(sink)
+
+    def test_update(self):
+        image = _image()
+        hist3D = Hist3D(None, 16, color_range='native', num_pixels=None).update(image)
+        expected = Hist3D(image, 16, color_range='native', num_pixels=None)
+        np.testing.assert_array_equal(hist3D.histSums()[1], expected.histSums()[1])
+
+    def test_tiled(self):
+        image = _image()
+        hist3D = tiledHist3D(image, 16, tile_shape=(8, None))
+        expected = Hist3D(image, 16, color_range='native', num_pixels=None)
+        np.testing.assert_array_equal(hist3D.histSums()[1], expected.histSums()[1])
+
+    def test_load(self):
+        data_dir = tempfile.mkdtemp()
+        try:
+            for hist in [Hist1D(_image(), 16, color_range='native'),
+                         Hist2D(_image(), 16, color_range='native'),
+                         Hist3D(_image(), 16, color_range='native')]:
+                file_path = os.path.join(data_dir, "hist.bin")
+                hist.save(file_path)
+                loaded = hist.load(file_path)
+                np.testing.assert_allclose(loaded.histBins(), hist.histBins())
+        finally:
+            shutil.rmtree(data_dir)
+
+    def test_load_raw_counts(self):
+        image = np.random.RandomState(0).randint(0, 256, size=(64, 64, 3)).astype(np.uint8)
+        data_dir = tempfile.mkdtemp()
+        try:
+            for hist in [Hist1D(image, 16, alpha=0.5, color_range='native', num_pixels=None),
+                         Hist2D(image, 16, alpha=0.5, color_range='native', num_pixels=None),
+                         Hist3D(image, 16, alpha=0.5, color_range='native', num_pixels=None),
+                         Hist3D(image, 16, alpha=0.5, color_range='native', num_pixels=None, storage='sparse')]:
+                file_path = os.path.join(data_dir, "hist.bin")
+                hist.save(file_path)
+                loaded = hist.load(file_path)
+                self.assertEqual(np.sum(loaded.histSums()[1]), 64 * 64)
+                np.testing.assert_allclose(loaded.histBins(), hist.histBins())
+
+                loaded.merge(hist)
+                self.assertEqual(np.sum(loaded.histSums()[1]), 2 * 64 * 64)
+        finally:
+            shutil.rmtree(data_dir)
+
+    def test_empty_store(self):
+        data_dir = tempfile.mkdtemp()
+        try:
+            file_path = os.path.join(data_dir, "store.bin")
+            createHistogramStore(file_path, Hist3D(_image(), 8, color_range='native').histHeader())
+            store = HistogramStore(file_path)
+            self.assertEqual(len(store), 0)
+            self.assertEqual(store.histBins().shape, (0, 8 ** 3))
+            self.assertEqual(store.colorBins().shape, (0, 8 ** 3, 3))
+            store.close()
+        finally:
+            shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
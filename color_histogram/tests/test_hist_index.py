@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.tests.test_hist_index
+#
+#  Add, query, remove, save and load of HistIndex.
+#  @author      tody
+#  @date        2026/10/18
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from color_histogram.core.hist_3d import Hist3D
+from color_histogram.index.hist_index import HistIndex
+
+
+def _hists(num_hists=200, num_bins=8, seed=0):
+    random_state = np.random.RandomState(seed)
+    hists = random_state.rand(num_hists, num_bins, num_bins, num_bins).astype(np.float32)
+    hists[hists < 0.7] = 0.0
+    return hists
+
+
+class HistIndexTest(unittest.TestCase):
+    def setUp(self):
+        self._hists = _hists()
+        self._keys = ["image_%s" % i for i in xrange(len(self._hists))]
+
+    def _index(self, method="bhattacharyya"):
+        hist_index = HistIndex(num_components=16, num_lists=8, num_probes=2, method=method)
+        hist_index.add(self._keys, self._hists)
+        return hist_index
+
+    def _checkTop1(self, hist_index, rows, exact=False):
+        for row in rows:
+            key, distance = hist_index.query(self._hists[row], k=1, exact=exact)[0]
+            self.assertEqual(key, self._keys[row])
+            self.assertAlmostEqual(distance, 0.0, places=5)
+
+    def test_query(self):
+        for method in ["bhattacharyya", "l2", "emd"]:
+            hist_index = self._index(method)
+            self._checkTop1(hist_index, range(0, 200, 20))
+
+            hist_index.train()
+            self._checkTop1(hist_index, range(0, 200, 20))
+            self._checkTop1(hist_index, range(0, 200, 20), exact=True)
+
+    def test_add_remove(self):
+        hist_index = self._index()
+        hist_index.train()
+
+        new_hists = _hists(10, seed=1)
+        hist_index.add(["new_%s" % i for i in xrange(10)], new_hists)
+        self.assertEqual(len(hist_index), 210)
+        self.assertEqual(hist_index.query(new_hists[3], k=1)[0][0], "new_3")
+
+        with self.assertRaises(KeyError):
+            hist_index.add(["new_3"], new_hists[3:4])
+
+        hist_index.remove(["image_5", "new_3"])
+        self.assertEqual(len(hist_index), 208)
+        self.assertNotEqual(hist_index.query(self._hists[5], k=1)[0][0], "image_5")
+        self.assertNotEqual(hist_index.query(new_hists[3], k=1)[0][0], "new_3")
+        self._checkTop1(hist_index, [4, 6, 199])
+
+    def test_save_load(self):
+        data_dir = tempfile.mkdtemp()
+        try:
+            for train in [False, True]:
+                hist_index = self._index("emd")
+                if train:
+                    hist_index.train()
+
+                file_path = os.path.join(data_dir, "index.npz")
+                hist_index.save(file_path)
+                loaded = HistIndex.load(file_path)
+
+                self.assertEqual(loaded.keys(), self._keys)
+                self.assertEqual(loaded.isTrained(), train)
+                self._checkTop1(loaded, range(0, 200, 20))
+        finally:
+            shutil.rmtree(data_dir)
+
+    def test_hists(self):
+        image = np.random.RandomState(0).randint(0, 256, size=(32, 48, 3)).astype(np.uint8)
+        hist3Ds = [Hist3D(image[:, :, ci], 8, color_range='native') for ci in [[0, 1, 2], [2, 1, 0], [1, 0, 2]]]
+
+        hist_index = HistIndex(num_components=2, num_lists=2)
+        hist_index.add(["a", "b", "c"], hist3Ds)
+        for key, hist3D in zip(["a", "b", "c"], hist3Ds):
+            self.assertEqual(hist_index.query(hist3D, k=1)[0][0], key)
+
+
+if __name__ == '__main__':
+    unittest.main()
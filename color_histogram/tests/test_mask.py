@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.tests.test_mask
+#
+#  Boolean masks and alpha thresholds of the target pixels.
+#  @author      tody
+#  @date        2026/10/18
+
+import unittest
+
+import numpy as np
+
+from color_histogram.core.color_pixels import ColorPixels, maskPixelIDs
+from color_histogram.core.hist_3d import Hist3D
+
+
+def _rgba(seed=0):
+    random_state = np.random.RandomState(seed)
+    image = random_state.randint(0, 256, size=(32, 48, 4)).astype(np.uint8)
+    image[:, :24, 3] = 0
+    image[:, 24:, 3] = 255
+    return image
+
+
+class MaskTest(unittest.TestCase):
+    def test_bool_mask(self):
+        image = _rgba()
+        mask = np.zeros(image.shape[:2], dtype=bool)
+        mask[4:8, 10:20] = True
+
+        pixel_ids = maskPixelIDs(image, mask)
+        np.testing.assert_array_equal(pixel_ids, np.flatnonzero(mask))
+
+        hist3D = Hist3D(image[:, :, :3], 8, color_range='native', num_pixels=None, mask=mask)
+        self.assertEqual(np.sum(hist3D.histSums()[1]), 40)
+
+    def test_alpha_threshold(self):
+        image = _rgba()
+        expected = np.flatnonzero(image[:, :, 3] > 127)
+        for threshold in [0.5, np.float32(0.5), np.float64(0.5)]:
+            np.testing.assert_array_equal(maskPixelIDs(image, threshold), expected)
+
+        self.assertEqual(len(maskPixelIDs(image, 0)), 32 * 24)
+        self.assertEqual(ColorPixels(image, None, mask=0.5).numPixels(), 32 * 24)
+
+        with self.assertRaises(ValueError):
+            maskPixelIDs(image[:, :, :3], 0.5)
+
+    def test_invalid_mask(self):
+        image = _rgba()
+        for mask in [True, False, np.bool_(True)]:
+            with self.assertRaises(ValueError):
+                maskPixelIDs(image, mask)
+
+        with self.assertRaises(ValueError):
+            maskPixelIDs(image, np.ones((48, 32), dtype=bool))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.tests.test_palette
+#
+#  Dominant color palettes with circular hue channels.
+#  @author      tody
+#  @date        2026/10/18
+
+import unittest
+
+import numpy as np
+
+from color_histogram.core.hist_1d import Hist1D
+from color_histogram.core.hist_3d import Hist3D
+from color_histogram.core.palette import histPalette
+
+
+## Reds on both sides of hue 0 (355 and 5 degrees), and a blue.
+def _image():
+    image = np.zeros((40, 40, 3), dtype=np.uint8)
+    image[:, :15] = (230, 20, 40)
+    image[:, 15:30] = (230, 40, 20)
+    image[:, 30:] = (20, 40, 230)
+    return image
+
+
+class PaletteTest(unittest.TestCase):
+    def _checkPalette(self, hist):
+        colors, weights = histPalette(hist, num_colors=2)
+        np.testing.assert_allclose(weights, [0.75, 0.25])
+        self.assertGreater(colors[0, 0], 0.8)
+        self.assertGreater(colors[1, 2], 0.8)
+
+    def test_hue(self):
+        image = _image()
+        for color_space in ["hsv", "OKLCh", "Lab"]:
+            self._checkPalette(Hist3D(image, 16, color_space=color_space, color_range='native', num_pixels=None))
+        self._checkPalette(Hist1D(image, 16, color_space="hsv", channel=0, color_range='native', num_pixels=None))
+
+
+if __name__ == '__main__':
+    unittest.main()
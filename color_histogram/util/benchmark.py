@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.util.benchmark
+#
+#  Benchmark utility package.
+#
+#  Latencies are measured with instrument.timerSeconds over repeated calls after warm-up calls.
+#  Peak memory is the peak resident set size of the process (resource.getrusage),
+#  which never decreases, so each case is run in a forked process to measure its own peak.
+#  @author      tody
+#  @date        2026/10/18
+
+import sys
+import multiprocessing
+import traceback
+
+import numpy as np
+
+from color_histogram.util.instrument import timerSeconds
+
+
+## Peak resident set size of the current process in MB.
+def peakRSS():
+    import resource
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is in bytes on OS X, in kilobytes on Linux.
+    if sys.platform == "darwin":
+        return max_rss / (1024.0 * 1024.0)
+    return max_rss / 1024.0
+
+
+## Latency statistics of the function.
+#  @param func          function without arguments.
+#  @param num_repeats   number of the measured calls.
+#  @param num_warmups   number of the calls before the measurement (e.g. for caches and lazy imports).
+#  @return              dict of p50_ms, p95_ms, mean_ms, min_ms, max_ms and num_repeats.
+def measureLatency(func, num_repeats=5, num_warmups=1):
+    for i in xrange(num_warmups):
+        func()
+
+    latencies = np.zeros(num_repeats)
+    for i in xrange(num_repeats):
+        t_start = timerSeconds()
+        func()
+        latencies[i] = max(timerSeconds() - t_start, 0.0)
+
+    latencies *= 1000.0
+    p50, p95 = np.percentile(latencies, [50, 95])
+    return {"p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "mean_ms": float(np.mean(latencies)),
+            "min_ms": float(np.min(latencies)),
+            "max_ms": float(np.max(latencies)),
+            "num_repeats": num_repeats}
+
+
+## Latency and peak memory statistics of the function.
+#
+#  peak_rss_mb is the peak of the process running the function,
+#  rss_delta_mb is the increase of the peak by the function.
+#  @param func          function without arguments.
+#  @param num_repeats   number of the measured calls.
+#  @param num_warmups   number of the calls before the measurement.
+#  @param isolate       run in a forked process, so the peak memory is not shared with the previous cases.
+#  @return              dict of the latency statistics, peak_rss_mb and rss_delta_mb.
+def measure(func, num_repeats=5, num_warmups=1, isolate=True):
+    if not isolate:
+        return _measure(func, num_repeats, num_warmups)
+
+    result_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_measureProcess,
+                                      args=(result_queue, func, num_repeats, num_warmups))
+    process.start()
+    stats, error = result_queue.get()
+    process.join()
+
+    if error is not None:
+        raise RuntimeError("Benchmark process failed:\n%s" % error)
+    return stats
+
+
+def _measure(func, num_repeats, num_warmups):
+    rss_start = peakRSS()
+    stats = measureLatency(func, num_repeats, num_warmups)
+
+    rss_peak = peakRSS()
+    stats["peak_rss_mb"] = rss_peak
+    stats["rss_delta_mb"] = rss_peak - rss_start
+    return stats
+
+
+def _measureProcess(result_queue, func, num_repeats, num_warmups):
+    try:
+        result_queue.put((_measure(func, num_repeats, num_warmups), None))
+    except Exception:
+        result_queue.put((None, traceback.format_exc()))
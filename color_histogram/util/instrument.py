@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+## @package color_histogram.util.instrument
+#
+#  Structured instrumentation of the hot paths.
+#
+#  Spans measure nested stages with timerSeconds, and counters record per-stage quantities
+#  (e.g. pixels sampled, bins occupied, conversions, bytes allocated) on the innermost open span.
+#  Finished spans are sent to the registered sinks as records:
+#  {"name", "path", "depth", "thread", "start", "duration_ms", "attrs", "counters"}.
+#  Instrumentation is disabled while no sink is registered:
+#  span() returns a shared no-op span and count() returns immediately.
+#  Counters with costly values should be guarded by enabled().
+#  @author      tody
+#  @date        2026/10/18
+
+import json
+import logging
+import functools
+import threading
+import time
+
+_sinks = []
+_local = threading.local()
+
+
+## Clock of the spans and timers in seconds.
+#
+#  time.clock_gettime(CLOCK_MONOTONIC) where available (Python 3.3+ on Unix).
+#  Otherwise time.time (e.g. Python 2), which is not monotonic and steps with the system clock adjustments,
+#  so durations are clamped to >= 0.
+if hasattr(time, "clock_gettime") and hasattr(time, "CLOCK_MONOTONIC"):
+    def timerSeconds():
+        return time.clock_gettime(time.CLOCK_MONOTONIC)
+else:
+    timerSeconds = time.time
+
+
+## Span of a stage. Use as a context manager.
+class Span:
+    ## Constructor
+    #  @param name    stage name.
+    #  @param attrs   attributes of the stage (e.g. color_space, num_bins).
+    def __init__(self, name, attrs):
+        self._name = name
+        self._attrs = attrs
+        self._counters = {}
+        self._path = name
+        self._depth = 0
+        self._start = None
+
+    def name(self):
+        return self._name
+
+    ## Add the value to the counter of the span.
+    def count(self, name, value=1):
+        self._counters[name] = self._counters.get(name, 0) + value
+
+    def __enter__(self):
+        stack = _spanStack()
+        if stack:
+            parent = stack[-1]
+            self._path = parent._path + "/" + self._name
+            self._depth = parent._depth + 1
+        stack.append(self)
+
+        self._start = timerSeconds()
+        return self
+
+    def __exit__(self, *args):
+        duration = max(timerSeconds() - self._start, 0.0)
+        _spanStack().pop()
+
+        record = {"name": self._name,
+                  "path": self._path,
+                  "depth": self._depth,
+                  "thread": threading.current_thread().name,
+                  "start": self._start,
+                  "duration_ms": 1000.0 * duration,
+                  "attrs": self._attrs,
+                  "counters": self._counters}
+        _emit(record)
+
+
+## No-op span while the instrumentation is disabled.
+class _NullSpan:
+    def name(self):
+        return None
+
+    def count(self, name, value=1):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_null_span = _NullSpan()
+
+
+## Span of the stage.
+#  @param name    stage name.
+#  @param attrs   attributes of the stage.
+#  @return        Span, or the shared no-op span while disabled.
+def span(name, **attrs):
+    if not _sinks:
+        return _null_span
+    return Span(name, attrs)
+
+
+## Add the value to the counter of the innermost open span.
+#
+#  Counters outside of the spans are sent to the sinks as records with duration_ms = None.
+def count(name, value=1):
+    if not _sinks:
+        return
+
+    stack = _spanStack()
+    if stack:
+        stack[-1].count(name, value)
+        return
+
+    _emit({"name": name, "path": name, "depth": 0,
+           "thread": threading.current_thread().name,
+           "start": timerSeconds(), "duration_ms": None,
+           "attrs": {}, "counters": {name: value}})
+
+
+## Decorator to run the function in a span.
+#  @param name    span name. None for the function name.
+def traced(func=None, name=None):
+    def _decorator(func):
+        span_name = func.__name__ if name is None else name
+
+        @functools.wraps(func)
+        def _with_span(*args, **kwargs):
+            if not _sinks:
+                return func(*args, **kwargs)
+
+            with Span(span_name, {}):
+                return func(*args, **kwargs)
+        return _with_span
+
+    if func:
+        return _decorator(func)
+    return _decorator
+
+
+## True if any sink is registered.
+def enabled():
+    return bool(_sinks)
+
+
+## Register the sink. A sink is a callable sink(record) (e.g. LoggerSink, AggregateSink, JSONLinesSink).
+def addSink(sink):
+    _sinks.append(sink)
+    return sink
+
+
+def removeSink(sink):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def clearSinks():
+    del _sinks[:]
+
+
+## Sink to log the records.
+class LoggerSink:
+    ## Constructor
+    #  @param logger   logger. None for the color_histogram logger.
+    #  @param level    log level of the records.
+    def __init__(self, logger=None, level=logging.DEBUG):
+        if logger is None:
+            logger = logging.getLogger("color_histogram")
+        self._logger = logger
+        self._level = level
+
+    def __call__(self, record):
+        if not self._logger.isEnabledFor(self._level):
+            return
+
+        message = record["path"]
+        if record["duration_ms"] is not None:
+            message += ": %f ms" % record["duration_ms"]
+        if record["counters"]:
+            message += " %s" % record["counters"]
+        self._logger.log(self._level, message)
+
+
+## In-memory sink to aggregate the records by the span path.
+class AggregateSink:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def __call__(self, record):
+        with self._lock:
+            stats = self._stats.get(record["path"])
+            if stats is None:
+                stats = {"count": 0, "total_ms": 0.0, "min_ms": None, "max_ms": None, "counters": {}}
+                self._stats[record["path"]] = stats
+
+            stats["count"] += 1
+            duration = record["duration_ms"]
+            if duration is not None:
+                duration = max(duration, 0.0)
+                stats["total_ms"] += duration
+                stats["min_ms"] = duration if stats["min_ms"] is None else min(stats["min_ms"], duration)
+                stats["max_ms"] = duration if stats["max_ms"] is None else max(stats["max_ms"], duration)
+
+            counters = stats["counters"]
+            for name, value in record["counters"].items():
+                counters[name] = counters.get(name, 0) + value
+
+    ## Per-stage breakdown.
+    #  @return  dict of span path: {"count", "total_ms", "mean_ms", "min_ms", "max_ms", "counters"}.
+    def summary(self):
+        with self._lock:
+            summary = {}
+            for path, stats in self._stats.items():
+                path_summary = dict(stats)
+                path_summary["counters"] = dict(stats["counters"])
+                path_summary["mean_ms"] = stats["total_ms"] / stats["count"]
+                summary[path] = path_summary
+            return summary
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
+
+
+## Sink to write the records in JSON lines.
+class JSONLinesSink:
+    ## Constructor
+    #  @param file_path   output file path. The records are appended.
+    def __init__(self, file_path):
+        self._file = open(file_path, "a")
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(record, sort_keys=True, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def _spanStack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = []
+        _local.stack = stack
+    return stack
+
+
+def _emit(record):
+    for sink in list(_sinks):
+        sink(record)
@@ -6,7 +6,9 @@
 #  @author      tody
 #  @date        2015/07/29
 
-import time
+import functools
+
+from color_histogram.util.instrument import span, timerSeconds
 
 
 class Timer(object):
@@ -18,15 +20,15 @@ class Timer(object):
         self.start()
 
     def start(self):
-        self._start_time = time.time()
+        self._start_time = timerSeconds()
 
     def stop(self):
-        self._end_time = time.time()
+        self._end_time = timerSeconds()
 
     def seconds(self):
         if self._end_time is None:
             self.stop()
-        return self._end_time - self._start_time
+        return max(self._end_time - self._start_time, 0.0)
 
     def milliseconds(self):
         return self.seconds() * 1000  # millisecs
@@ -51,21 +53,23 @@ class Timer(object):
         return self._secondsStr()
 
 
+## Decorator to measure the function in an instrumentation span (see color_histogram.util.instrument).
+#  @param timer_name   span name. None for the function name.
+#  @param logger       logger for the debug message of the seconds. None for the span only.
 def timing_func(func=None, timer_name=None, logger=None):
     def _decorator(func):
         _timerName = timer_name
         if timer_name is None:
             _timerName = func.__name__
 
-        import functools
-
         @functools.wraps(func)
         def _with_timing(*args, **kwargs):
+            if logger is None:
+                with span(_timerName):
+                    return func(*args, **kwargs)
 
-            with Timer(_timerName, output=True, logger=logger) as t:
-                ret = func(*args, **kwargs)
-
-            return ret
+            with Timer(_timerName, logger=logger), span(_timerName):
+                return func(*args, **kwargs)
         return _with_timing
 
     if func: